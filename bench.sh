@@ -0,0 +1 @@
+python3 src/bench_pipeline.py "$@"
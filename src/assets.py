@@ -0,0 +1,114 @@
+import os
+import shutil
+
+from build import BuildReport, remove_output
+from manifest import load_manifest, manifest_path, save_manifest
+
+ASSETS_MANIFEST_SUFFIX = ".assets.json"
+COPY_CHUNK = 1 << 30
+
+
+def sync_assets(static_dir, public_dir, link=False, reserved=(), force=False):
+    """
+    Mirrors the files of static_dir into public_dir, skipping files whose
+    size and mtime already match and removing assets that are gone from
+    static_dir. With link, files are hard-linked instead of copied where the
+    file system allows it. Paths in reserved belong to rendered pages and
+    must not be overwritten. Returns a BuildReport of asset paths.
+    """
+    if not os.path.isdir(static_dir):
+        raise ValueError(f"static directory not found: {static_dir}")
+    path = manifest_path(public_dir, ASSETS_MANIFEST_SUFFIX)
+    old_entries = {} if force else load_manifest(path)
+    entries = {}
+    report = BuildReport()
+    made_dirs = set()
+    prefix = len(os.path.join(static_dir, ""))
+    for source, stat in find_assets(static_dir):
+        key = source[prefix:]
+        dest = os.path.join(public_dir, key)
+        if dest in reserved:
+            raise ValueError(f"asset would overwrite a page: {source}")
+        entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if not force:
+            try:
+                dest_stat = os.stat(dest)
+            except FileNotFoundError:
+                pass
+            else:
+                if (
+                    dest_stat.st_size == stat.st_size
+                    and dest_stat.st_mtime_ns == stat.st_mtime_ns
+                ):
+                    report.skipped.append(dest)
+                    continue
+        directory = os.path.dirname(dest)
+        if directory not in made_dirs:
+            os.makedirs(directory, exist_ok=True)
+            made_dirs.add(directory)
+        copy_asset(source, dest, stat, link)
+        report.rebuilt.append(dest)
+    for key in old_entries.keys() - entries.keys():
+        dest = os.path.join(public_dir, key)
+        remove_output(dest, public_dir)
+        report.removed.append(dest)
+    if entries != old_entries:
+        save_manifest(path, entries)
+    return report
+
+
+def find_assets(static_dir):
+    """
+    Returns sorted (path, stat) pairs of the files below static_dir.
+    """
+    assets = []
+    directories = [static_dir]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    directories.append(entry.path)
+                elif entry.is_file():
+                    assets.append((entry.path, entry.stat()))
+    assets.sort()
+    return assets
+
+
+def copy_asset(source, dest, stat, link=False):
+    """
+    Replaces dest with a hard link to source or a copy of it carrying the
+    mtime of source. The new file is made under a temporary name first, so
+    an older hard link at dest never gets written through.
+    """
+    tmp_path = dest + ".tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    if link:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            # Other file systems and platforms without links get a copy.
+            link = False
+    if not link:
+        copy_file(source, tmp_path)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, dest)
+
+
+def copy_file(source, dest):
+    """
+    Copies the contents of source into dest inside the kernel, with
+    copy_file_range where available and sendfile through shutil otherwise.
+    """
+    if hasattr(os, "copy_file_range"):
+        with open(source, "rb") as source_file, open(dest, "wb") as dest_file:
+            try:
+                while os.copy_file_range(
+                    source_file.fileno(), dest_file.fileno(), COPY_CHUNK
+                ):
+                    pass
+                return
+            except OSError:
+                # Some file systems and older kernels refuse copy_file_range.
+                pass
+    shutil.copyfile(source, dest)
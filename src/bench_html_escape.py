@@ -0,0 +1,117 @@
+import time
+
+from block_markdown import (
+    leaf_node_class,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+from corpus import generate_corpus
+from htmlnode import PROPS_CACHE, HTMLNode, LeafNode, serialize_props
+
+REPEAT = 15
+
+
+def unescaped_leaf_to_html(self):
+    """
+    LeafNode.to_html without escaping, as it was before.
+    """
+    if self.value is None:
+        raise ValueError("leaf node must have value")
+    elif self.tag is None:
+        return self.value
+    return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+
+def unescaped_props_to_html(self):
+    """
+    HTMLNode.props_to_html without escaping or caching, as it was before.
+    """
+    if not self.props:
+        return ""
+    props_text = ""
+    for prop, value in self.props.items():
+        props_text += f' {prop}="{value}"'
+    return props_text
+
+
+def leaves(node):
+    """
+    Yields the leaf nodes below node.
+    """
+    if isinstance(node, LeafNode):
+        yield node
+        return
+    for child in node.children:
+        # Plain text is written inline as strings.
+        if not isinstance(child, str):
+            yield from leaves(child)
+
+
+def best_time(func, repeat=REPEAT):
+    """
+    Returns the fastest of repeat timed calls of func.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    documents = [markdown for _, markdown in generate_corpus(pages=200)]
+    html_nodes = [markdown_to_html_node(markdown) for markdown in documents]
+    props = [leaf.props for node in html_nodes for leaf in leaves(node) if leaf.props]
+
+    def to_html():
+        for html_node in html_nodes:
+            html_node.to_html()
+
+    # The two serializers take turns so that machine noise hits both alike.
+    escaped = unescaped = float("inf")
+    leaf_to_html = LeafNode.to_html
+    props_to_html = HTMLNode.props_to_html
+    for _ in range(REPEAT):
+        escaped = min(escaped, best_time(to_html, 1))
+        LeafNode.to_html = unescaped_leaf_to_html
+        HTMLNode.props_to_html = unescaped_props_to_html
+        try:
+            unescaped = min(unescaped, best_time(to_html, 1))
+        finally:
+            LeafNode.to_html = leaf_to_html
+            HTMLNode.props_to_html = props_to_html
+    # Blocks are checked once while the tree is built, so that check is
+    # part of the cost of escaping too.
+    blocks = [
+        block for markdown in documents for block in markdown_to_blocks(markdown)
+    ]
+
+    def check_blocks():
+        for block in blocks:
+            leaf_node_class(block)
+
+    overhead = escaped - unescaped + best_time(check_blocks)
+    print(
+        f"to_html: {escaped * 1000:.2f} ms escaped, "
+        f"{unescaped * 1000:.2f} ms unescaped; escaping costs "
+        f"{overhead * 1000:.2f} ms ({overhead / escaped:.1%} of to_html)"
+    )
+
+    def props_uncached():
+        for item in props:
+            serialize_props(item)
+
+    def props_cached():
+        for item in props:
+            PROPS_CACHE[tuple(item.items())]
+
+    print(
+        f"props: {best_time(props_uncached) * 1000:.2f} ms serialized each time, "
+        f"{best_time(props_cached) * 1000:.2f} ms from the cache "
+        f"({len(props)} props)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import timeit
+
+from inline_markdown import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from textnode import TextNode, TextType
+
+SENTENCE = (
+    "This is **bold text** with an _italic_ word, a `code span`, "
+    "an ![image](https://example.com/image.png) and a "
+    "[link](https://example.com/page) in the middle of plain text. "
+)
+
+
+def chained_text_to_textnodes(text):
+    """
+    Converts text to TextNodes with the five chained split passes.
+    """
+    new_nodes = [TextNode(text, TextType.TEXT)]
+    new_nodes = split_nodes_image(new_nodes)
+    new_nodes = split_nodes_link(new_nodes)
+    new_nodes = split_nodes_delimiter(new_nodes, "`", TextType.CODE)
+    new_nodes = split_nodes_delimiter(new_nodes, "_", TextType.ITALIC)
+    new_nodes = split_nodes_delimiter(new_nodes, "**", TextType.BOLD)
+    return new_nodes
+
+
+def make_paragraphs(count, sentences):
+    """
+    Builds inline-heavy paragraphs of the given number of sentences.
+    """
+    return [SENTENCE * sentences for _ in range(count)]
+
+
+def make_link_paragraph(links):
+    """
+    Builds a paragraph with the given number of links.
+    """
+    return "".join(
+        f"Some words before [link {idx}](https://example.com/{idx}) "
+        for idx in range(links)
+    )
+
+
+def bench(func, paragraphs, repeat=7):
+    """
+    Returns the best wall time of converting all paragraphs with func.
+    """
+    timer = timeit.Timer(lambda: [func(paragraph) for paragraph in paragraphs])
+    return min(timer.repeat(repeat=repeat, number=1))
+
+
+def main():
+    for count, sentences in ((1000, 1), (200, 10), (20, 100)):
+        paragraphs = make_paragraphs(count, sentences)
+        if chained_text_to_textnodes(paragraphs[0]) != text_to_textnodes(
+            paragraphs[0]
+        ):
+            raise ValueError("single-pass output differs from chained output")
+        chained = bench(chained_text_to_textnodes, paragraphs)
+        single = bench(text_to_textnodes, paragraphs)
+        print(
+            f"{count} paragraphs x {sentences} sentences: "
+            f"chained {chained * 1000:.2f} ms, single-pass {single * 1000:.2f} ms, "
+            f"speedup {chained / single:.1f}x"
+        )
+
+    # Time per link should stay flat as the paragraph grows.
+    for links in (10, 100, 1000):
+        paragraphs = [make_link_paragraph(links)] * (10000 // links)
+        nodes = [[TextNode(paragraph, TextType.TEXT)] for paragraph in paragraphs]
+        elapsed = min(
+            timeit.Timer(lambda: [split_nodes_link(node) for node in nodes]).repeat(
+                repeat=7, number=1
+            )
+        )
+        print(
+            f"split_nodes_link, {links} links per paragraph: "
+            f"{elapsed / 10000 * 1e6:.3f} us per link"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from build import build
+from corpus import generate_corpus, write_corpus
+from pipeline import share_malloc_arena
+
+PAGES = 400
+# Pages this many times larger than the rest, as in the biggest doc sites.
+HUGE_PAGES = 8
+HUGE_FACTOR = 400
+# (budget, whether the build shares one malloc arena, as --single-arena)
+RUNS = ((None, False), (64 << 20, False), (8 << 20, False), (8 << 20, True))
+
+
+def write_site(content_dir):
+    """
+    Writes a generated corpus with a few huge pages into content_dir.
+    """
+    corpus = generate_corpus(pages=PAGES)
+    for idx in range(HUGE_PAGES):
+        path, markdown = corpus[idx]
+        corpus[idx] = (path, markdown * HUGE_FACTOR)
+    write_corpus(content_dir, corpus)
+    return sum(len(markdown) for _, markdown in corpus)
+
+
+def run_child(content_dir, public_dir, budget, single_arena):
+    """
+    Builds in a fresh process and returns its wall time, peak RSS and stage
+    high-water marks.
+    """
+    process = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            content_dir,
+            public_dir,
+            json.dumps([budget, single_arena]),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(process.stdout)
+
+
+def child_main(content_dir, public_dir, budget, single_arena):
+    if single_arena:
+        share_malloc_arena()
+    start = time.perf_counter()
+    report = build(content_dir, public_dir, workers=1, memory_budget=budget)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "rss_kib": peak, "stages": report.stages}))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        content_dir = os.path.join(tmp, "content")
+        size = write_site(content_dir)
+        print(
+            f"{PAGES} pages, {HUGE_PAGES} of them {HUGE_FACTOR}x larger, "
+            f"{size / (1 << 20):.1f} MiB of Markdown, one process:"
+        )
+        for run, (budget, single_arena) in enumerate(RUNS):
+            public_dir = os.path.join(tmp, f"public-{run}")
+            result = run_child(content_dir, public_dir, budget, single_arena)
+            label = "unbounded" if budget is None else f"{budget >> 20} MiB budget"
+            if single_arena:
+                label += ", one arena"
+            print(
+                f"  {label}: {result['seconds']:.2f}s, "
+                f"peak RSS {result['rss_kib'] / 1024:.0f} MiB"
+            )
+            for stage, marks in result["stages"].items():
+                name = stage if stage == "in flight" else f"{stage} queue"
+                print(
+                    f"    {name}: {marks['peak_bytes'] / (1 << 20):.1f} MiB "
+                    f"in {marks['peak_items']} pages, "
+                    f"blocked {marks['blocked_seconds']:.2f}s"
+                )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        child_main(sys.argv[1], sys.argv[2], *json.loads(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,71 @@
+import tracemalloc
+
+from htmlnode import HTMLNode, LeafNode
+from inline_markdown import text_to_textnodes
+from textnode import TextNode, text_node_to_html_node
+
+PARAGRAPH = (
+    "This is **bold text** with an _italic_ word, a `code span`, "
+    "an ![image](https://example.com/image.png) and a "
+    "[link](https://example.com/page) in the middle of plain text. "
+)
+NODE_COUNT = 100_000
+
+# Plain per-instance-dict classes reproduce the node layout before __slots__.
+DictTextNode = type("DictTextNode", (), {"__init__": TextNode.__init__})
+DictHTMLNode = type("DictHTMLNode", (), {"__init__": HTMLNode.__init__})
+
+
+def make_document():
+    """
+    Returns a synthetic document of NODE_COUNT text nodes.
+    """
+    text_nodes = []
+    while len(text_nodes) < NODE_COUNT:
+        text_nodes.extend(text_to_textnodes(PARAGRAPH))
+    return text_nodes[:NODE_COUNT]
+
+
+def bytes_per_node(build, text_nodes):
+    """
+    Returns the bytes traced while building one node per text node.
+    """
+    tracemalloc.start()
+    snapshot_start = tracemalloc.take_snapshot()
+    nodes = [build(text_node) for text_node in text_nodes]
+    snapshot_end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # The list holding the nodes is not part of the node cost.
+    stats = snapshot_end.compare_to(snapshot_start, "filename")
+    size = sum(stat.size_diff for stat in stats) - nodes.__sizeof__()
+    return size / len(nodes)
+
+
+def main():
+    text_nodes = make_document()
+    html_nodes = [text_node_to_html_node(text_node) for text_node in text_nodes]
+    cases = (
+        (
+            "TextNode",
+            text_nodes,
+            lambda node: DictTextNode(node.text, node.text_type, node.url),
+            lambda node: TextNode(node.text, node.text_type, node.url),
+        ),
+        (
+            "LeafNode",
+            html_nodes,
+            lambda node: DictHTMLNode(node.tag, node.value, None, node.props),
+            lambda node: LeafNode(node.tag, node.value, node.props),
+        ),
+    )
+    for name, nodes, build_before, build_after in cases:
+        before = bytes_per_node(build_before, nodes)
+        after = bytes_per_node(build_after, nodes)
+        print(
+            f"{name}: {before:.1f} bytes per node with __dict__, "
+            f"{after:.1f} bytes per node with __slots__ ({len(nodes)} nodes)"
+        )
+
+
+if __name__ == "__main__":
+    main()
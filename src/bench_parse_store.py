@@ -0,0 +1,63 @@
+import os
+import tempfile
+import time
+
+from build import build
+from corpus import generate_corpus, write_corpus
+from parse_store import ParseStore
+
+PAGES = 1000
+REPEAT = 5
+
+
+def layout_rebuild(content_dir, public_dir, template, store, round_number):
+    """
+    Changes the layout and returns the wall time of the rebuild it causes.
+    """
+    with open(template, "w", encoding="utf-8") as file:
+        file.write(f"<!-- {round_number} --><main>{{{{ Content }}}}</main>")
+    start = time.perf_counter()
+    report = build(content_dir, public_dir, workers=1, template=template, store=store)
+    elapsed = time.perf_counter() - start
+    if len(report.rebuilt) != PAGES:
+        raise ValueError(f"expected {PAGES} rebuilt pages, got {report}")
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        content_dir = os.path.join(tmp, "content")
+        template = os.path.join(tmp, "template.html")
+        write_corpus(content_dir, generate_corpus(pages=PAGES))
+        store = ParseStore(os.path.join(tmp, "trees"))
+        plain_public = os.path.join(tmp, "plain")
+        store_public = os.path.join(tmp, "stored")
+        # Fill the manifests and the parse store first.
+        layout_rebuild(content_dir, plain_public, template, None, -1)
+        layout_rebuild(content_dir, store_public, template, store, -1)
+        # The two builds take turns so that machine noise hits both alike.
+        plain = stored = float("inf")
+        for number in range(REPEAT):
+            plain = min(
+                plain,
+                layout_rebuild(content_dir, plain_public, template, None, number),
+            )
+            stored = min(
+                stored,
+                layout_rebuild(content_dir, store_public, template, store, number),
+            )
+        size = sum(
+            entry.stat().st_size
+            for prefix in os.scandir(store.directory)
+            for entry in os.scandir(prefix.path)
+        )
+        source_size = sum(len(markdown) for _, markdown in generate_corpus(pages=PAGES))
+    print(
+        f"layout-only rebuild of {PAGES} pages: {plain:.2f}s parsing, "
+        f"{stored:.2f}s from stored trees ({plain / stored:.1f}x); "
+        f"store {size / 1024:.0f} KiB for {source_size / 1024:.0f} KiB of Markdown"
+    )
+
+
+if __name__ == "__main__":
+    main()
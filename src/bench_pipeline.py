@@ -0,0 +1,163 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from block_markdown import (
+    BlockType,
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+from corpus import generate_corpus
+from inline_markdown import text_to_textnodes
+from textnode import text_node_to_html_node
+
+STAGES = (
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "text_node_to_html_node",
+    "to_html",
+)
+
+
+def time_stages(documents):
+    """
+    Returns the seconds and call count spent in each stage over documents.
+    Every stage is fed the output of the previous one, computed up front,
+    so only the stage itself is timed.
+    """
+    timer = time.perf_counter
+    seconds = dict.fromkeys(STAGES, 0.0)
+    calls = dict.fromkeys(STAGES, 0)
+
+    start = timer()
+    page_blocks = [markdown_to_blocks(markdown) for markdown in documents]
+    seconds["markdown_to_blocks"] += timer() - start
+    calls["markdown_to_blocks"] += len(documents)
+
+    blocks = [block for page in page_blocks for block in page]
+    start = timer()
+    block_types = [block_to_block_type(block) for block in blocks]
+    seconds["block_to_block_type"] += timer() - start
+    calls["block_to_block_type"] += len(blocks)
+
+    # Code blocks are never parsed for inline markdown.
+    inline_blocks = [
+        block
+        for block, block_type in zip(blocks, block_types)
+        if block_type != BlockType.CODE
+    ]
+    start = timer()
+    text_nodes = [text_to_textnodes(block) for block in inline_blocks]
+    seconds["text_to_textnodes"] += timer() - start
+    calls["text_to_textnodes"] += len(inline_blocks)
+
+    flat_nodes = [node for nodes in text_nodes for node in nodes]
+    start = timer()
+    for node in flat_nodes:
+        text_node_to_html_node(node)
+    seconds["text_node_to_html_node"] += timer() - start
+    calls["text_node_to_html_node"] += len(flat_nodes)
+
+    html_nodes = [markdown_to_html_node(markdown) for markdown in documents]
+    start = timer()
+    for html_node in html_nodes:
+        html_node.to_html()
+    seconds["to_html"] += timer() - start
+    calls["to_html"] += len(html_nodes)
+    return seconds, calls
+
+
+def run(config, repeat):
+    """
+    Runs the stage timings repeat times and returns the JSON-ready results,
+    keeping the best time of each stage.
+    """
+    documents = [markdown for _, markdown in generate_corpus(**config)]
+    best = dict.fromkeys(STAGES, float("inf"))
+    for _ in range(repeat):
+        seconds, calls = time_stages(documents)
+        for stage in STAGES:
+            best[stage] = min(best[stage], seconds[stage])
+    return {
+        "config": config,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "bytes": sum(len(markdown) for markdown in documents),
+        "stages": {
+            stage: {"seconds": best[stage], "calls": calls[stage]} for stage in STAGES
+        },
+        "total_seconds": sum(best.values()),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the stages that got slower than baseline by more than tolerance.
+    """
+    regressions = []
+    for stage in STAGES:
+        before = baseline["stages"].get(stage, {}).get("seconds")
+        after = results["stages"][stage]["seconds"]
+        if before and after > before * (1 + tolerance):
+            regressions.append((stage, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each conversion stage.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blocks-per-page", type=int, default=20)
+    parser.add_argument(
+        "--block-mix",
+        type=json.loads,
+        default=None,
+        help='JSON block type weights, e.g. \'{"paragraph": 3, "code": 1}\'',
+    )
+    parser.add_argument("--link-density", type=float, default=1.0)
+    parser.add_argument("--nesting", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed slowdown per stage against the baseline (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    config = {
+        "pages": args.pages,
+        "seed": args.seed,
+        "blocks_per_page": args.blocks_per_page,
+        "block_mix": args.block_mix,
+        "link_density": args.link_density,
+        "nesting": args.nesting,
+    }
+    results = run(config, args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.tolerance)
+        for stage, before, after in regressions:
+            print(
+                f"regression: {stage} {before * 1000:.2f} ms -> {after * 1000:.2f} ms",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import time
+
+import block_markdown
+from block_markdown import TREE_TEXT_TYPES, markdown_to_html_node
+from corpus import generate_corpus
+from htmlnode import HTMLNode, LeafNode, SafeLeafNode
+from textnode import text_part_to_html_node
+
+REPEAT = 30
+
+
+def leaf_run_to_children(run):
+    """
+    run_to_children as text_to_children was before, with an untagged leaf
+    node per plain text run.
+    """
+    leaf_node = LeafNode if run[0] else SafeLeafNode
+    return [
+        text_part_to_html_node(TREE_TEXT_TYPES[code], text, url, leaf_node)
+        for code, text, url in zip(run[1::3], run[2::3], run[3::3])
+    ]
+
+
+def count_nodes(node):
+    """
+    Returns the number of HTML nodes in the tree below and including node.
+    """
+    count = 1
+    for child in node.children or ():
+        if isinstance(child, HTMLNode):
+            count += count_nodes(child)
+    return count
+
+
+def best_time(func, repeat=REPEAT):
+    """
+    Returns the fastest of repeat timed calls of func.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build_trees(documents):
+    return [markdown_to_html_node(markdown) for markdown in documents]
+
+
+def build_leaf_trees(documents):
+    """
+    Returns the trees of documents built with a leaf node per text run.
+    """
+    run_to_children = block_markdown.run_to_children
+    block_markdown.run_to_children = leaf_run_to_children
+    try:
+        return build_trees(documents)
+    finally:
+        block_markdown.run_to_children = run_to_children
+
+
+def main():
+    documents = [markdown for _, markdown in generate_corpus(pages=200)]
+    leaf_trees = build_leaf_trees(documents)
+    inline_trees = build_trees(documents)
+    for leaf_tree, inline_tree in zip(leaf_trees, inline_trees):
+        if leaf_tree.to_html() != inline_tree.to_html():
+            raise ValueError("the two tree shapes render differently")
+
+    def to_html(trees):
+        def run():
+            for tree in trees:
+                tree.to_html()
+
+        return run
+
+    # The two shapes take turns so that machine noise hits both alike.
+    leaf_build = inline_build = float("inf")
+    for _ in range(10):
+        leaf_build = min(leaf_build, best_time(lambda: build_leaf_trees(documents), 1))
+        inline_build = min(inline_build, best_time(lambda: build_trees(documents), 1))
+    leaf_time = inline_time = float("inf")
+    for _ in range(REPEAT):
+        leaf_time = min(leaf_time, best_time(to_html(leaf_trees), 1))
+        inline_time = min(inline_time, best_time(to_html(inline_trees), 1))
+    leaf_nodes = sum(map(count_nodes, leaf_trees))
+    inline_nodes = sum(map(count_nodes, inline_trees))
+    print(
+        f"nodes: {leaf_nodes} with text leaves, {inline_nodes} with inline "
+        f"text ({1 - inline_nodes / leaf_nodes:.1%} fewer)"
+    )
+    print(
+        f"build: {leaf_build * 1000:.2f} ms with text leaves, "
+        f"{inline_build * 1000:.2f} ms with inline text "
+        f"({1 - inline_build / leaf_build:.1%} faster)"
+    )
+    print(
+        f"to_html: {leaf_time * 1000:.2f} ms with text leaves, "
+        f"{inline_time * 1000:.2f} ms with inline text "
+        f"({1 - inline_time / leaf_time:.1%} faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import time
+
+from block_markdown import markdown_to_blocks
+from corpus import generate_corpus
+from htmlnode import LeafNode
+from inline_markdown import text_to_textnodes
+from textnode import TextType, text_node_to_html_node, text_nodes_to_html
+
+REPEAT = 15
+
+
+def match_text_node_to_html_node(text_node, leaf_node=LeafNode):
+    """
+    text_node_to_html_node as it was before, with a membership check and a
+    match statement.
+    """
+    if text_node.text_type not in TextType:
+        raise ValueError("wrong text type in conversion")
+    match text_node.text_type:
+        case TextType.TEXT:
+            return leaf_node(None, text_node.text)
+        case TextType.BOLD:
+            return leaf_node("b", text_node.text)
+        case TextType.ITALIC:
+            return leaf_node("i", text_node.text)
+        case TextType.CODE:
+            return leaf_node("code", text_node.text)
+        case TextType.LINK:
+            return leaf_node("a", text_node.text, {"href": text_node.url})
+        case TextType.IMAGE:
+            return leaf_node("img", "", {"src": text_node.url, "alt": text_node.text})
+
+
+def best_time(func, repeat=REPEAT):
+    """
+    Returns the fastest of repeat timed calls of func.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    runs = [
+        text_to_textnodes(block)
+        for _, markdown in generate_corpus(pages=200)
+        for block in markdown_to_blocks(markdown)
+        if not block.startswith("```")
+    ]
+    node_count = sum(map(len, runs))
+
+    def convert(func):
+        def run():
+            for text_nodes in runs:
+                "".join([func(text_node).to_html() for text_node in text_nodes])
+
+        return run
+
+    def batch():
+        for text_nodes in runs:
+            text_nodes_to_html(text_nodes)
+
+    for text_nodes in runs:
+        expected = "".join(
+            match_text_node_to_html_node(text_node).to_html()
+            for text_node in text_nodes
+        )
+        if text_nodes_to_html(text_nodes) != expected:
+            raise ValueError("the batch conversion renders differently")
+
+    # The conversions take turns so that machine noise hits them alike.
+    times = {"match": float("inf"), "table": float("inf"), "batch": float("inf")}
+    for _ in range(REPEAT):
+        times["match"] = min(
+            times["match"], best_time(convert(match_text_node_to_html_node), 1)
+        )
+        times["table"] = min(
+            times["table"], best_time(convert(text_node_to_html_node), 1)
+        )
+        times["batch"] = min(times["batch"], best_time(batch, 1))
+    print(f"{node_count} text nodes in {len(runs)} blocks to HTML:")
+    for name, label in (
+        ("match", "match statement and leaf nodes"),
+        ("table", "dispatch table and leaf nodes"),
+        ("batch", "text_nodes_to_html"),
+    ):
+        print(
+            f"  {label}: {times[name] * 1000:.2f} ms "
+            f"({times['match'] / times[name]:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import hashlib
+import marshal
+import os
+from collections import OrderedDict
+
+from block_markdown import block_to_html, markdown_to_blocks
+
+BLOCK_CACHE_VERSION = 2
+
+
+class BlockCache:
+    """
+    LRU cache of rendered block HTML keyed by the hash of the block text.
+    Bounded by a number of entries, a number of HTML characters, or both.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Only process-pool workers record new entries, see track_added.
+        self.added = None
+
+    def block_to_html(self, block):
+        """
+        Returns the HTML of a Markdown block, rendering it on a miss.
+        """
+        key = hashlib.blake2b(block.encode("utf-8"), digest_size=16).digest()
+        html = self.entries.get(key)
+        if html is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return html
+        self.misses += 1
+        html = block_to_html(block)
+        self.put(key, html)
+        if self.added is not None:
+            self.added.append((key, html))
+        return html
+
+    def markdown_to_html(self, markdown):
+        """
+        Converts a full Markdown document into div HTML through the cache.
+        """
+        blocks = markdown_to_blocks(markdown)
+        return "<div>" + "".join(map(self.block_to_html, blocks)) + "</div>"
+
+    def put(self, key, html):
+        """
+        Stores an entry and evicts the least recently used ones over the limits.
+        """
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = html
+        self.size += len(html)
+        while self.entries and (
+            (self.max_entries is not None and len(self.entries) > self.max_entries)
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def track_added(self):
+        """
+        Starts recording newly rendered entries for take_updates.
+        """
+        self.added = []
+
+    def take_updates(self):
+        """
+        Returns and resets the entries and hit and miss counts gathered since
+        the last call, so a process-pool worker can hand them back to the
+        parent. Evictions are left out: the parent counts its own when it
+        stores the entries.
+        """
+        updates = (self.added or [], self.hits, self.misses)
+        self.added = []
+        self.hits = self.misses = 0
+        return updates
+
+    def merge_updates(self, updates):
+        """
+        Applies updates returned by take_updates in another process.
+        """
+        added, hits, misses = updates
+        for key, html in added:
+            self.put(key, html)
+        self.hits += hits
+        self.misses += misses
+
+    def stats(self):
+        """
+        Returns the cache counters as a dict.
+        """
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def load(self, path):
+        """
+        Loads entries persisted by save. A missing, unreadable or outdated
+        file leaves the cache empty.
+        """
+        try:
+            with open(path, "rb") as cache_file:
+                version, entries = marshal.load(cache_file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if version != BLOCK_CACHE_VERSION:
+            return
+        for key, html in entries:
+            self.put(key, html)
+
+    def save(self, path):
+        """
+        Atomically persists the entries in least recently used order.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as cache_file:
+            marshal.dump((BLOCK_CACHE_VERSION, list(self.entries.items())), cache_file)
+        os.replace(tmp_path, path)
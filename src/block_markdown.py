@@ -1,6 +1,10 @@
 import re
 from enum import Enum
 
+from htmlnode import LeafNode, ParentNode, SafeLeafNode, escape_text
+from inline_markdown import text_to_textnodes
+from textnode import TextType, text_part_to_html_node, text_parts_to_html
+
 
 class BlockType(Enum):
     """
@@ -15,6 +19,20 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+CODE_PATTERN = re.compile(r"^```[a-zA-Z0-9]*\n[\s\S]*\n```$")
+# Every line of a list block must start with a marker followed by whitespace.
+UNORDERED_LIST_PATTERN = re.compile(
+    r"[^\S\n]*[-+*][^\S\n][^\n]*(?:\n[^\S\n]*[-+*][^\S\n][^\n]*)*"
+)
+ORDERED_LIST_PATTERN = re.compile(
+    r"[^\S\n]*[1-9]\d*\.[^\S\n][^\n]*(?:\n[^\S\n]*[1-9]\d*\.[^\S\n][^\n]*)*"
+)
+# Parse trees store text types as small ints, which marshal compactly.
+TREE_TEXT_TYPES = tuple(TextType)
+TREE_TEXT_TYPE_CODES = {text_type: code for code, text_type in enumerate(TextType)}
+
+
 def markdown_to_blocks(markdown):
     """
     Convert markdown sting into a list of non-empty, stripped block of strings.
@@ -27,19 +45,246 @@ def markdown_to_blocks(markdown):
     ]
 
 
+def iter_markdown_blocks(source, chunk_size=1 << 16):
+    """
+    Lazily yields the blocks markdown_to_blocks would return for the content
+    of a text or binary file object or an mmap. Only the current block and
+    one chunk are held in memory. Binary content is decoded as UTF-8.
+    """
+    chunk = source.read(chunk_size)
+    binary = not isinstance(chunk, str)
+    if binary:
+        separator, newline, empty = b"\n\n", b"\n", b""
+    else:
+        separator, newline, empty = "\n\n", "\n", ""
+    pieces = []
+    while chunk:
+        start = 0
+        if pieces and pieces[-1][-1:] == newline and chunk[:1] == newline:
+            # The separator straddles the boundary between two chunks.
+            pieces[-1] = pieces[-1][:-1]
+            yield from strip_block(empty.join(pieces), binary)
+            pieces = []
+            start = 1
+        end = chunk.find(separator, start)
+        while end != -1:
+            pieces.append(chunk[start:end])
+            yield from strip_block(empty.join(pieces), binary)
+            pieces = []
+            start = end + 2
+            end = chunk.find(separator, start)
+        if start < len(chunk):
+            pieces.append(chunk[start:])
+        chunk = source.read(chunk_size)
+    yield from strip_block(empty.join(pieces), binary)
+
+
+def strip_block(block, binary):
+    """
+    Yields the stripped block unless it is empty.
+    """
+    if binary:
+        block = block.decode("utf-8")
+    block = block.strip()
+    if block:
+        yield block
+
+
 def block_to_block_type(block):
     """
     Returns the type of the given Markdown block.
     """
-    if re.match(r"#{1,6} ", block):
-        return BlockType.HEADING
-    elif re.match("^```[a-zA-Z0-9]*\n[\s\S]*\n```$", block):
-        return BlockType.CODE
-    elif all(re.match(r"^>\s*", line) for line in block.split("\n")):
-        return BlockType.QUOTE
-    elif all(re.match(r"^\s*[-+*]\s", line) for line in block.split("\n")):
-        return BlockType.UNORDERED_LIST
-    elif all(re.match(r"^\s*[1-9]\d*\.\s", line) for line in block.split("\n")):
-        return BlockType.ORDERED_LIST
-    else:
+    if not block:
         return BlockType.PARAGRAPH
+    # The first character rules out all but one block type (two for leading
+    # whitespace), so only the checks that can still match are run.
+    first = block[0]
+    if first == "#":
+        if HEADING_PATTERN.match(block):
+            return BlockType.HEADING
+    elif first == "`":
+        if CODE_PATTERN.match(block):
+            return BlockType.CODE
+    elif first == ">":
+        if block.count("\n") == block.count("\n>"):
+            return BlockType.QUOTE
+    elif first in "-+*":
+        if UNORDERED_LIST_PATTERN.fullmatch(block):
+            return BlockType.UNORDERED_LIST
+    elif first in "123456789":
+        if ORDERED_LIST_PATTERN.fullmatch(block):
+            return BlockType.ORDERED_LIST
+    elif first.isspace():
+        if UNORDERED_LIST_PATTERN.fullmatch(block):
+            return BlockType.UNORDERED_LIST
+        elif ORDERED_LIST_PATTERN.fullmatch(block):
+            return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def markdown_to_html_node(markdown):
+    """
+    Converts a full Markdown document into a div HTML node, which is empty
+    when the document has no blocks.
+    """
+    children = [block_to_html_node(block) for block in markdown_to_blocks(markdown)]
+    return ParentNode("div", children or [""])
+
+
+def markdown_to_html(markdown):
+    """
+    Converts a full Markdown document into div HTML through its parse tree,
+    without building the node tree.
+    """
+    return tree_to_html(markdown_to_tree(markdown))
+
+
+def block_to_html_node(block):
+    """
+    Converts a single Markdown block into an HTML node, built from its parse
+    tree.
+    """
+    return tree_block_to_node(block_to_tree(block))
+
+
+def tree_block_to_node(block):
+    """
+    Builds the HTML node of a (tag, body) block of a tree.
+    """
+    tag, body = block
+    if tag == "pre":
+        return ParentNode("pre", [leaf_node_class(body)("code", body)])
+    elif tag == "ul" or tag == "ol":
+        return ParentNode(tag, [ParentNode("li", run_to_children(run)) for run in body])
+    return ParentNode(tag, run_to_children(body))
+
+
+def block_to_html(block):
+    """
+    Converts a single Markdown block into the HTML of its node, through its
+    parse tree.
+    """
+    return tree_block_to_html(block_to_tree(block))
+
+
+def markdown_to_tree(markdown):
+    """
+    Parses a full Markdown document into a tree of tuples, strings and
+    booleans that marshal can store. Each block is a (tag, body) pair: the
+    code text for pre, a tuple of inline runs for ul and ol, and one inline
+    run otherwise. A run is a flat (escape, code, text, url, code, text,
+    url, ...) tuple with a TREE_TEXT_TYPE_CODES code per text node. A
+    document with no blocks has an empty tree.
+    """
+    return tuple(map(block_to_tree, markdown_to_blocks(markdown)))
+
+
+def block_to_tree(block):
+    """
+    Parses a single Markdown block into a (tag, body) pair.
+    """
+    block_type = block_to_block_type(block)
+    if block_type == BlockType.HEADING:
+        level = len(block) - len(block.lstrip("#"))
+        return f"h{level}", text_to_run(block[level + 1 :])
+    elif block_type == BlockType.CODE:
+        return "pre", block[block.index("\n") + 1 : -3]
+    elif block_type == BlockType.QUOTE:
+        lines = [line.lstrip(">").strip() for line in block.split("\n")]
+        return "blockquote", text_to_run(" ".join(lines))
+    elif block_type == BlockType.UNORDERED_LIST:
+        items = [line.lstrip()[1:].strip() for line in block.split("\n")]
+        return "ul", tuple(map(text_to_run, items))
+    elif block_type == BlockType.ORDERED_LIST:
+        items = [line.split(".", 1)[1].strip() for line in block.split("\n")]
+        return "ol", tuple(map(text_to_run, items))
+    return "p", text_to_run(" ".join(block.split("\n")))
+
+
+def text_to_run(text):
+    """
+    Parses inline Markdown text into an inline run, which has no text nodes
+    when the text is empty.
+    """
+    text_nodes = text_to_textnodes(text)
+    codes = TREE_TEXT_TYPE_CODES
+    run = [needs_escaping(text)]
+    for node in text_nodes:
+        run += (codes[node.text_type], node.text, node.url)
+    return tuple(run)
+
+
+def tree_to_html(tree):
+    """
+    Renders a tree from markdown_to_tree into div HTML, the same as the
+    document's node tree would.
+    """
+    return "<div>" + "".join(map(tree_block_to_html, tree)) + "</div>"
+
+
+def tree_block_to_html(block):
+    """
+    Renders a (tag, body) block of a tree into HTML.
+    """
+    tag, body = block
+    if tag == "pre":
+        return f"<pre><code>{escape_text(body)}</code></pre>"
+    elif tag == "ul" or tag == "ol":
+        items = "".join(f"<li>{run_to_html(run)}</li>" for run in body)
+        return f"<{tag}>{items}</{tag}>"
+    return f"<{tag}>{run_to_html(body)}</{tag}>"
+
+
+def run_to_html(run):
+    """
+    Renders an inline run into HTML, as text_nodes_to_html does its nodes.
+    """
+    text_types = map(TREE_TEXT_TYPES.__getitem__, run[1::3])
+    return text_parts_to_html(zip(text_types, run[2::3], run[3::3]), run[0])
+
+
+def text_to_children(text):
+    """
+    Converts inline Markdown text into a list of HTML nodes.
+    """
+    return run_to_children(text_to_run(text))
+
+
+def run_to_children(run):
+    """
+    Converts an inline run into a list of HTML nodes. Plain text runs become
+    strings of escaped text written inline by the parent instead of untagged
+    leaf nodes. A run without text nodes gives one empty string, so its
+    parent renders as an empty element.
+    """
+    escape = run[0]
+    leaf_node = LeafNode if escape else SafeLeafNode
+    text_types = TREE_TEXT_TYPES
+    text_code = TREE_TEXT_TYPE_CODES[TextType.TEXT]
+    children = []
+    append = children.append
+    for idx in range(1, len(run), 3):
+        code, text, url = run[idx : idx + 3]
+        if code == text_code:
+            append(escape_text(text) if escape else text)
+        else:
+            append(text_part_to_html_node(text_types[code], text, url, leaf_node))
+    return children or [""]
+
+
+def needs_escaping(text):
+    """
+    Returns whether text has characters to escape in HTML content.
+    """
+    return "&" in text or "<" in text or ">" in text
+
+
+def leaf_node_class(text):
+    """
+    Returns the leaf node class for values taken from text. Checking the whole
+    block once lets its leaves skip the escaping check when it has nothing to
+    escape.
+    """
+    if needs_escaping(text):
+        return LeafNode
+    return SafeLeafNode
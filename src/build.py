@@ -0,0 +1,533 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from block_markdown import markdown_to_html_node, markdown_to_tree, tree_to_html
+from depgraph import page_links, reverse_links
+from htmlnode import escape_attribute, escape_text
+from manifest import file_hash, manifest_path, read_manifest, save_manifest
+from pipeline import run_pipeline
+from template import extract_title, load_template
+
+
+class BuildReport:
+    """
+    Lists the output paths a build rebuilt, skipped and removed, and the
+    high-water marks of the memory budget and of the queue after each stage
+    when pages went through the memory-bounded pipeline.
+    """
+
+    def __init__(self):
+        self.rebuilt = []
+        self.skipped = []
+        self.removed = []
+        self.stages = {}
+
+    def __repr__(self):
+        return (
+            f"BuildReport(rebuilt={len(self.rebuilt)}, "
+            f"skipped={len(self.skipped)}, removed={len(self.removed)})"
+        )
+
+
+# Block cache of a process-pool worker, set by init_worker.
+WORKER_CACHE = None
+# A parse tree takes about 5.3 times the memory of its Markdown on the
+# generated corpus, so the bounded pipeline counts queued trees at this.
+TREE_SIZE_FACTOR = 6
+# Share of its even split of the bytes a shard may go over, see shard_pages.
+SHARD_SLACK = 0.1
+# A page in the bounded pipeline holds its source, text, tree and HTML at
+# once, about 9 times its size in all, so it takes this much of the budget.
+PAGE_SIZE_FACTOR = 10
+
+
+def build(
+    content_dir,
+    public_dir,
+    workers=None,
+    force=False,
+    cache=None,
+    template=None,
+    store=None,
+    shard=None,
+    memory_budget=None,
+):
+    """
+    Renders the Markdown pages under content_dir that changed since the last
+    build into public_dir, along with the pages showing the titles of pages
+    whose title changed, and removes outputs whose sources are gone.
+    Blocks are rendered through cache when a BlockCache is given, and pages
+    are wrapped in the layout at the template path when one is given. With
+    a ParseStore, pages are rendered from their stored parse trees instead,
+    and trees of sources that are gone are pruned.
+
+    With shard=(index, count), index counted from 1, only the pages that
+    shard_pages deals to that shard are rendered, and the manifest lists
+    them as its pages so merge_shards can combine the shards.
+
+    With memory_budget, pages go through the bounded read, parse, render and
+    write stages of render_pages_bounded instead, with at most about that
+    many bytes of pages in flight; the block cache is not used then.
+    """
+    if not os.path.isdir(content_dir):
+        raise ValueError(f"content directory not found: {content_dir}")
+    if template is not None and not os.path.isfile(template):
+        raise ValueError(f"template not found: {template}")
+    if shard is not None and not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"invalid shard: {shard[0]}/{shard[1]}")
+    template_id = template_identity(template)
+    path = manifest_path(public_dir)
+    manifest = None if force else read_manifest(path)
+    old_pages = old_shard = None
+    if manifest is not None:
+        old_pages = manifest.get("pages", {})
+        old_shard = manifest.get("shard")
+    old_entries = dict(old_pages or {})
+    if old_shard is not None:
+        # Pages of other shards only matter for their titles here.
+        old_entries.update(old_shard["others"])
+    entries = {}
+    report = BuildReport()
+    pages = []
+    stale_keys = set()
+    # find_pages joins onto both roots, so slicing is a cheap relpath.
+    content_prefix = len(os.path.join(content_dir, ""))
+    public_prefix = len(os.path.join(public_dir, ""))
+    for source, dest in find_pages(content_dir, public_dir):
+        key = source[content_prefix:]
+        old_entry = old_entries.get(key)
+        entry = page_entry(source, dest[public_prefix:], old_entry, template_id)
+        entries[key] = entry
+        pages.append((key, source, dest))
+        if not (
+            old_entry
+            and entry["hash"] == old_entry["hash"]
+            and entry["template"] == old_entry["template"]
+            and os.path.exists(dest)
+        ):
+            stale_keys.add(key)
+
+    # Pages showing a title that changed, or that of an added or removed
+    # page, are stale too.
+    retitled = old_entries.keys() - entries.keys()
+    for key, entry in entries.items():
+        old_entry = old_entries.get(key)
+        if old_entry is None or old_entry["title"] != entry["title"]:
+            retitled.add(key)
+    dependents = reverse_links(entries)
+    for key in retitled:
+        stale_keys.update(dependents.get(key, ()))
+
+    owned = entries
+    if shard is not None:
+        sizes = [(key, entries[key]["size"]) for key, _, _ in pages]
+        owned = {
+            key: entries[key]
+            for (key, _), owner in zip(sizes, shard_pages(sizes, shard[1]))
+            if owner == shard[0] - 1
+        }
+
+    stale = []
+    titles = []
+    for key, source, dest in pages:
+        if key not in owned:
+            continue
+        elif key not in stale_keys:
+            report.skipped.append(dest)
+            continue
+        stale.append((source, dest))
+        titles.append(
+            {
+                url: entries[target]["title"] if target in entries else url
+                for url, target in entries[key]["links"]
+            }
+        )
+    if memory_budget is None:
+        report.rebuilt = render_pages(stale, workers, cache, template, titles, store)
+    else:
+        report.rebuilt, report.stages = render_pages_bounded(
+            stale, memory_budget, workers, template, titles, store
+        )
+    for key, entry in (old_pages or {}).items():
+        if key not in owned:
+            dest = os.path.join(public_dir, entry["output"])
+            remove_output(dest, public_dir)
+            report.removed.append(dest)
+    new_shard = None
+    if shard is not None:
+        others = {key: entry for key, entry in entries.items() if key not in owned}
+        new_shard = {"index": shard[0], "count": shard[1], "others": others}
+    if owned != (old_pages or {}) or new_shard != old_shard:
+        save_manifest(path, owned, new_shard)
+    if store is not None:
+        store.prune({entry["hash"] for entry in entries.values()})
+    return report
+
+
+def shard_pages(pages, count):
+    """
+    Returns the shard, counted from 0, of each (key, size) page by
+    rendezvous hashing weighted by size. Every page ranks the shards by a
+    hash of the shard and its path and, taking pages in the order of their
+    path hash, goes to the first shard in its ranking that still has room
+    for its bytes within SHARD_SLACK of an even share; a page too big for
+    any goes to the lightest shard. The slack keeps nearly every page on
+    its first choice, so editing a page rarely moves another one, while no
+    shard ends up far over its share of the bytes. Every shard working on
+    the same tree gets the same answer, whatever the listing order.
+    """
+    capacity = (1 + SHARD_SLACK) * sum(size for _, size in pages) / count
+    names = [key.replace(os.sep, "/").encode("utf-8") for key, _ in pages]
+    order = sorted(range(len(pages)), key=lambda idx: (path_hash(names[idx]), idx))
+    loads = [0] * count
+    owners = [0] * len(pages)
+    for idx in order:
+        size = pages[idx][1]
+        ranking = sorted(
+            range(count),
+            key=lambda shard: path_hash(names[idx], shard),
+            reverse=True,
+        )
+        owner = next(
+            (shard for shard in ranking if loads[shard] + size <= capacity),
+            min(range(count), key=loads.__getitem__),
+        )
+        owners[idx] = owner
+        loads[owner] += size
+    return owners
+
+
+def path_hash(name, shard=None):
+    """
+    Returns the hash of a page path, or of a page path on a shard.
+    """
+    salt = b"" if shard is None else b"%d" % shard
+    return hashlib.blake2b(name, digest_size=8, salt=salt).digest()
+
+
+def template_identity(template):
+    """
+    Returns the manifest value of a template: its path and content hash.
+    """
+    if template is None:
+        return None
+    return f"{template}:{file_hash(template)}"
+
+
+def page_entry(source, output, old_entry, template_id=None):
+    """
+    Returns the manifest entry of a page, with its title and title links.
+    The content hash, title and links of old_entry are reused when the file
+    size and mtime are unchanged.
+    """
+    stat = os.stat(source)
+    entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "template": template_id,
+        "output": output,
+    }
+    if (
+        old_entry
+        and old_entry["size"] == stat.st_size
+        and old_entry["mtime_ns"] == stat.st_mtime_ns
+    ):
+        entry["hash"] = old_entry["hash"]
+        entry["title"] = old_entry["title"]
+        entry["links"] = old_entry["links"]
+        return entry
+    with open(source, "rb") as source_file:
+        data = source_file.read()
+    try:
+        markdown = data.decode("utf-8")
+    except ValueError as error:
+        raise ValueError(f"{source}: {error}") from error
+    entry["hash"] = hashlib.sha256(data).hexdigest()
+    entry["title"] = extract_title(markdown, page_stem(source))
+    entry["links"] = page_links(markdown, output)
+    return entry
+
+
+def page_stem(source):
+    """
+    Returns the file name of a Markdown source without its extension.
+    """
+    return os.path.basename(source)[: -len(".md")]
+
+
+def render_pages(
+    pages, workers=None, cache=None, template=None, titles=None, store=None
+):
+    """
+    Renders (source, dest) pairs in a process pool and returns the dest paths.
+    titles holds the {url: title} of the title links of each page.
+    """
+    sources = [source for source, _ in pages]
+    dests = [dest for _, dest in pages]
+    templates = [template] * len(pages)
+    titles = titles or [None] * len(pages)
+    stores = [store] * len(pages)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pages) <= 1:
+        return [
+            render_page(source, dest, cache, template, page_titles, store)
+            for (source, dest), page_titles in zip(pages, titles)
+        ]
+    # Big chunks keep the per-task pickling overhead small on large sites.
+    chunksize = max(1, len(pages) // (workers * 4))
+    if cache is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    render_page,
+                    sources,
+                    dests,
+                    [None] * len(pages),
+                    templates,
+                    titles,
+                    stores,
+                    chunksize=chunksize,
+                )
+            )
+    rendered = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(cache,)
+    ) as executor:
+        for dest, updates in executor.map(
+            render_worker_page,
+            sources,
+            dests,
+            templates,
+            titles,
+            stores,
+            chunksize=chunksize,
+        ):
+            cache.merge_updates(updates)
+            rendered.append(dest)
+    return rendered
+
+
+def init_worker(cache):
+    """
+    Installs the block cache of a process-pool worker.
+    """
+    global WORKER_CACHE
+    WORKER_CACHE = cache
+    WORKER_CACHE.track_added()
+
+
+def render_worker_page(source, dest, template=None, titles=None, store=None):
+    """
+    Renders a page in a worker and returns its path with the cache updates.
+    """
+    dest = render_page(source, dest, WORKER_CACHE, template, titles, store)
+    return dest, WORKER_CACHE.take_updates()
+
+
+def render_pages_bounded(
+    pages, memory_budget, workers=None, template=None, titles=None, store=None
+):
+    """
+    Renders (source, dest) pairs through bounded_pipeline and returns the
+    dest paths in page order with the high-water marks of each stage. With
+    several workers, each process runs a pipeline over its share of the
+    pages, dealt by shard_pages, within an equal share of the budget,
+    and the marks are summed over the processes: a bound on the peak.
+    """
+    titles = titles or [None] * len(pages)
+    items = [
+        (source, dest, page_titles)
+        for (source, dest), page_titles in zip(pages, titles)
+    ]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(pages)))
+    if workers == 1:
+        return bounded_pipeline(items, memory_budget, template, store)
+    shares = [[] for _ in range(workers)]
+    sizes = [(source, os.path.getsize(source)) for source, _ in pages]
+    for item, owner in zip(items, shard_pages(sizes, workers)):
+        shares[owner].append(item)
+    rendered = []
+    stages = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                bounded_pipeline, share, memory_budget // workers, template, store
+            )
+            for share in shares
+        ]
+        for future in futures:
+            share_rendered, share_stages = future.result()
+            rendered.extend(share_rendered)
+            for stage, marks in share_stages.items():
+                totals = stages.setdefault(stage, dict.fromkeys(marks, 0))
+                for name, value in marks.items():
+                    totals[name] += value
+    order = {dest: idx for idx, (_, dest) in enumerate(pages)}
+    rendered.sort(key=order.__getitem__)
+    return rendered, stages
+
+
+def bounded_pipeline(items, memory_budget, template=None, store=None):
+    """
+    Renders (source, dest, titles) items through read, parse, render and
+    write stages on their own threads, so reading and writing overlap with
+    the work in between. A page takes PAGE_SIZE_FACTOR times its source size
+    of memory_budget from before it is read until it is written, so the
+    pages in flight hold at most about memory_budget bytes. Returns the
+    dest paths and the high-water marks of the budget and of each queue.
+    """
+    rendered = []
+    made_dirs = set()
+    layout = None if template is None else load_template(template)
+
+    def weigh(item):
+        return os.path.getsize(item[0]) * PAGE_SIZE_FACTOR
+
+    def read(item):
+        source, dest, titles = item
+        with open(source, "rb") as source_file:
+            data = source_file.read()
+        return (source, dest, titles, data), len(data)
+
+    def parse(item):
+        source, dest, titles, data = item
+        try:
+            markdown = decode_source(data)
+            if store is None:
+                tree = markdown_to_tree(markdown)
+            else:
+                key = hashlib.sha256(data).hexdigest()
+                tree = store.markdown_to_tree(markdown, key)
+        except ValueError as error:
+            raise ValueError(f"{source}: {error}") from error
+        title = None
+        if layout is not None:
+            title = escape_text(extract_title(markdown, page_stem(source)))
+        return (dest, titles, title, tree), len(markdown) * TREE_SIZE_FACTOR
+
+    def render(item):
+        dest, titles, title, tree = item
+        html = tree_to_html(tree)
+        if titles:
+            html = fill_link_titles(html, titles)
+        if layout is not None:
+            html = layout.render({"Title": title, "Content": html})
+        return (dest, html), len(html)
+
+    def write(item):
+        dest, html = item
+        directory = os.path.dirname(dest) or "."
+        if directory not in made_dirs:
+            os.makedirs(directory, exist_ok=True)
+            made_dirs.add(directory)
+        with open(dest, "w", encoding="utf-8") as dest_file:
+            dest_file.write(html)
+        rendered.append(dest)
+
+    stages = run_pipeline(
+        items,
+        (("read", read), ("parse", parse), ("render", render), ("write", write)),
+        memory_budget,
+        weigh,
+    )
+    return rendered, stages
+
+
+def find_pages(content_dir, public_dir):
+    """
+    Returns sorted (source, dest) path pairs for the Markdown files in content_dir.
+    """
+    pages = []
+    for dirpath, dirnames, filenames in os.walk(content_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(".md"):
+                continue
+            source = os.path.join(dirpath, filename)
+            pages.append((source, output_path(source, content_dir, public_dir)))
+    return pages
+
+
+def output_path(source, content_dir, public_dir):
+    """
+    Returns the HTML output path of a Markdown source under content_dir.
+    """
+    relative = source[len(os.path.join(content_dir, "")) :]
+    return os.path.join(public_dir, relative[: -len(".md")] + ".html")
+
+
+def render_page(source, dest, cache=None, template=None, titles=None, store=None):
+    """
+    Converts one Markdown file into an HTML file and returns its path.
+    Empty-text links to the urls in titles show the title given for them.
+    """
+    with open(source, "rb") as source_file:
+        data = source_file.read()
+    try:
+        markdown = decode_source(data)
+        if store is not None:
+            key = hashlib.sha256(data).hexdigest()
+            content = store.markdown_to_html(markdown, key)
+        elif cache is None:
+            content = markdown_to_html_node(markdown)
+        else:
+            content = cache.markdown_to_html(markdown)
+    except ValueError as error:
+        raise ValueError(f"{source}: {error}") from error
+    if titles:
+        if not isinstance(content, str):
+            content = content.to_html()
+        content = fill_link_titles(content, titles)
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    with open(dest, "w", encoding="utf-8") as dest_file:
+        if template is not None:
+            title = escape_text(extract_title(markdown, page_stem(source)))
+            load_template(template).write(
+                dest_file, {"Title": title, "Content": content}
+            )
+        elif isinstance(content, str):
+            dest_file.write(content)
+        else:
+            content.write_html(dest_file)
+    return dest
+
+
+def decode_source(data):
+    """
+    Returns the text of a UTF-8 source file with its line endings translated
+    to newlines, as reading it in text mode would.
+    """
+    text = data.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def fill_link_titles(html, titles):
+    """
+    Puts the title of each url in titles into the empty links to it in html.
+    """
+    for url, title in titles.items():
+        href = escape_attribute(url)
+        html = html.replace(
+            f'<a href="{href}"></a>', f'<a href="{href}">{escape_text(title)}</a>'
+        )
+    return html
+
+
+def remove_output(dest, public_dir):
+    """
+    Deletes an output file, its precompressed copy and any directories they
+    leave empty in public_dir.
+    """
+    for path in (dest, dest + ".gz"):
+        if os.path.exists(path):
+            os.remove(path)
+    directory = os.path.dirname(dest)
+    root = os.path.normpath(public_dir)
+    while os.path.normpath(directory) != root and os.path.isdir(directory):
+        if os.listdir(directory):
+            break
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
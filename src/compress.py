@@ -0,0 +1,113 @@
+import hashlib
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from build import BuildReport
+from manifest import load_manifest, manifest_path, save_manifest
+
+COMPRESS_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+GZIP_MANIFEST_SUFFIX = ".gzip.json"
+# zlib wbits that wrap the deflate stream in a gzip header and trailer.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def precompress(public_dir, level=9, min_size=1024, workers=None, force=False):
+    """
+    Writes a .gz copy next to every compressible file of at least min_size
+    bytes in public_dir whose content changed since the last run, and removes
+    copies that are no longer needed. Returns a BuildReport of .gz paths.
+    """
+    if not 1 <= level <= 9:
+        raise ValueError(f"compression level must be between 1 and 9: {level}")
+    path = manifest_path(public_dir, GZIP_MANIFEST_SUFFIX)
+    old_entries = {} if force else load_manifest(path)
+    entries = {}
+    report = BuildReport()
+    stale = []
+    prefix = len(os.path.join(public_dir, ""))
+    for source in find_compressible(public_dir):
+        key = source[prefix:]
+        stat = os.stat(source)
+        if stat.st_size < min_size:
+            if os.path.exists(source + ".gz"):
+                os.remove(source + ".gz")
+                report.removed.append(source + ".gz")
+            continue
+        old_entry = old_entries.get(key)
+        if (
+            old_entry
+            and old_entry["level"] == level
+            and old_entry["size"] == stat.st_size
+            and old_entry["mtime_ns"] == stat.st_mtime_ns
+            and os.path.exists(source + ".gz")
+        ):
+            entries[key] = old_entry
+            report.skipped.append(source + ".gz")
+        else:
+            stale.append((key, source, old_entry))
+
+    # zlib releases the GIL while compressing, so threads run in parallel
+    # without the pickling cost of a process pool.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda item: compress_file(item[1], item[2], level), stale
+        )
+        for (key, source, _), (entry, written) in zip(stale, results):
+            entries[key] = entry
+            if written:
+                report.rebuilt.append(source + ".gz")
+            else:
+                report.skipped.append(source + ".gz")
+    for key in old_entries.keys() - entries.keys():
+        dest = os.path.join(public_dir, key + ".gz")
+        if os.path.exists(dest):
+            os.remove(dest)
+            report.removed.append(dest)
+    if entries != old_entries:
+        save_manifest(path, entries)
+    return report
+
+
+def compress_file(source, old_entry, level):
+    """
+    Writes source.gz unless old_entry shows the same content was already
+    compressed at level. Returns the new manifest entry and whether the file
+    was written.
+    """
+    with open(source, "rb") as source_file:
+        data = source_file.read()
+        stat = os.fstat(source_file.fileno())
+    entry = {
+        "hash": hashlib.sha256(data).hexdigest(),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "level": level,
+    }
+    dest = source + ".gz"
+    if (
+        old_entry
+        and old_entry["hash"] == entry["hash"]
+        and old_entry["level"] == level
+        and os.path.exists(dest)
+    ):
+        return entry, False
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    tmp_path = dest + ".tmp"
+    with open(tmp_path, "wb") as dest_file:
+        dest_file.write(compressor.compress(data) + compressor.flush())
+    os.replace(tmp_path, dest)
+    return entry, True
+
+
+def find_compressible(public_dir):
+    """
+    Returns the sorted paths of the files in public_dir worth precompressing.
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(public_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(COMPRESS_EXTENSIONS):
+                paths.append(os.path.join(dirpath, filename))
+    return paths
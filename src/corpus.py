@@ -0,0 +1,105 @@
+import os
+import random
+
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 5,
+    "heading": 1,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 1,
+    "ordered_list": 1,
+}
+WORDS = (
+    "static site generator markdown block inline node render page build "
+    "content public template layout cache index search feed asset link image "
+    "heading paragraph quote list code text bold italic output input fast"
+).split()
+
+
+def generate_corpus(
+    pages=100,
+    seed=0,
+    blocks_per_page=20,
+    block_mix=None,
+    link_density=1.0,
+    nesting=2,
+):
+    """
+    Returns a deterministic list of (relative path, markdown) pages.
+    block_mix weights the block types, link_density is the mean number of
+    links per inline block and nesting bounds both the list indentation and
+    the directory depth of the pages.
+    """
+    rng = random.Random(seed)
+    mix = block_mix or DEFAULT_BLOCK_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    corpus = []
+    for page in range(pages):
+        depth = rng.randint(0, nesting)
+        directories = [f"section-{rng.randint(0, 9)}" for _ in range(depth)]
+        path = os.path.join(*directories, f"page-{page}.md")
+        blocks = [f"# Page {page}"]
+        for kind in rng.choices(kinds, weights, k=blocks_per_page - 1):
+            blocks.append(make_block(rng, kind, link_density, nesting))
+        corpus.append((path, "\n\n".join(blocks) + "\n"))
+    return corpus
+
+
+def write_corpus(directory, corpus):
+    """
+    Writes (relative path, markdown) pages under directory.
+    """
+    for path, markdown in corpus:
+        full_path = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as file:
+            file.write(markdown)
+
+
+def make_block(rng, kind, link_density, nesting):
+    """
+    Returns one Markdown block of the given kind.
+    """
+    if kind == "heading":
+        return "#" * rng.randint(2, 6) + " " + make_inline(rng, 6, link_density / 4)
+    elif kind == "code":
+        lines = [" ".join(rng.choices(WORDS, k=6)) for _ in range(rng.randint(2, 8))]
+        return "```python\n" + "\n".join(lines) + "\n```"
+    elif kind == "quote":
+        lines = [make_inline(rng, 10, link_density / 2) for _ in range(3)]
+        return "\n".join("> " + line for line in lines)
+    elif kind == "unordered_list":
+        items = [make_inline(rng, 8, link_density / 4) for _ in range(5)]
+        return "\n".join(
+            "  " * rng.randint(0, nesting) + "- " + item for item in items
+        )
+    elif kind == "ordered_list":
+        items = [make_inline(rng, 8, link_density / 4) for _ in range(5)]
+        return "\n".join(
+            "  " * rng.randint(0, nesting) + f"{idx}. " + item
+            for idx, item in enumerate(items, 1)
+        )
+    lines = [make_inline(rng, 16, link_density / 3) for _ in range(3)]
+    return "\n".join(lines)
+
+
+def make_inline(rng, words, link_density):
+    """
+    Returns a line of words with inline formatting, images and links.
+    """
+    parts = []
+    for word in rng.choices(WORDS, k=words):
+        roll = rng.random()
+        if roll < 0.08:
+            word = f"**{word}**"
+        elif roll < 0.14:
+            word = f"_{word}_"
+        elif roll < 0.18:
+            word = f"`{word}`"
+        elif roll < 0.19:
+            word = f"![{word}](/images/{word}.png)"
+        parts.append(word)
+        if rng.random() < link_density / words:
+            parts.append(f"[{rng.choice(WORDS)}](/pages/{rng.randint(0, 999)}.html)")
+    return " ".join(parts)
@@ -0,0 +1,201 @@
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from block_markdown import markdown_to_html
+
+LATENCY_WINDOW = 10_000
+
+
+class LatencyStats:
+    """
+    Keeps the latencies of the latest requests and reports percentiles.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.lock = threading.Lock()
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, fraction):
+        """
+        Returns the latency in milliseconds below which fraction of the
+        recorded requests fall, or 0.0 without requests.
+        """
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        idx = min(len(samples) - 1, int(fraction * len(samples)))
+        return samples[idx] * 1000
+
+    def summary(self):
+        return {
+            "requests": self.count,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+        }
+
+
+class RenderDaemon:
+    """
+    Renders batches of Markdown documents sent as JSON lines, in this
+    process or in a pool of workers that keep the renderer loaded.
+
+    A request is {"id": ..., "documents": [markdown, ...]} and gets
+    {"id": ..., "results": [{"html": ...} or {"error": ...}], "ms": ...}.
+    {"id": ..., "command": "stats"} returns the request count and the p50 and
+    p99 latencies.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.stats = LatencyStats()
+        self.executor = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            # Start every worker now, so the first requests do not pay for
+            # process startup and imports.
+            list(self.executor.map(render_document, ["# warm up"] * workers))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def handle_line(self, line):
+        """
+        Returns the JSON response line for a JSON request line, given as
+        text or UTF-8 bytes.
+        """
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as error:
+            return json.dumps({"error": f"invalid request: {error}"})
+        response = {"id": request.get("id")}
+        if request.get("command") == "stats":
+            response.update(self.stats.summary())
+            return json.dumps(response)
+        documents = request.get("documents")
+        if not isinstance(documents, list) or not all(
+            isinstance(document, str) for document in documents
+        ):
+            response["error"] = "documents must be a list of strings"
+            return json.dumps(response)
+        response["results"] = self.render(documents)
+        elapsed = time.perf_counter() - start
+        self.stats.record(elapsed)
+        response["ms"] = round(elapsed * 1000, 3)
+        return json.dumps(response)
+
+    def render(self, documents):
+        """
+        Returns the result of every document, spread over the workers.
+        """
+        if self.executor is None or len(documents) <= 1:
+            return [render_document(document) for document in documents]
+        chunksize = max(1, len(documents) // (self.workers * 4))
+        return list(
+            self.executor.map(render_document, documents, chunksize=chunksize)
+        )
+
+    def serve_stream(self, lines, output):
+        """
+        Answers every request line of lines on output until the input ends.
+        """
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                response = self.handle_line(line)
+            except Exception as error:
+                # One bad request must not take the daemon down.
+                response = json.dumps({"error": f"internal error: {error!r}"})
+            output.write(response + "\n")
+            output.flush()
+
+    def serve_socket(self, path):
+        """
+        Answers request lines on a Unix socket at path until interrupted,
+        each connection on its own thread.
+        """
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                writer = LineWriter(self.wfile)
+                # json.loads decodes each line, so bad UTF-8 is an invalid
+                # request rather than an error in this loop.
+                daemon.serve_stream(self.rfile, writer)
+
+        if os.path.exists(path):
+            os.remove(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+            server.daemon_threads = True
+            try:
+                server.serve_forever()
+            finally:
+                os.remove(path)
+
+
+class LineWriter:
+    """
+    Adapts a binary socket file to the text writes of serve_stream.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode("utf-8"))
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def render_document(markdown):
+    """
+    Returns {"html": ...} for a Markdown document, or {"error": ...} when
+    rendering it fails for any reason.
+    """
+    try:
+        return {"html": markdown_to_html(markdown)}
+    except ValueError as error:
+        return {"error": str(error)}
+    except Exception as error:
+        return {"error": f"internal error: {error!r}"}
+
+
+def run_daemon(socket_path=None, workers=1):
+    """
+    Serves render requests on stdin and stdout, or on a Unix socket, and
+    prints the latency summary to stderr on exit.
+    """
+    daemon = RenderDaemon(workers)
+    try:
+        if socket_path is None:
+            daemon.serve_stream(sys.stdin, sys.stdout)
+        else:
+            daemon.serve_socket(socket_path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        summary = daemon.stats.summary()
+        print(
+            f"Served {summary['requests']} requests, p50 {summary['p50_ms']:.2f} ms, "
+            f"p99 {summary['p99_ms']:.2f} ms",
+            file=sys.stderr,
+        )
@@ -0,0 +1,79 @@
+import os
+import posixpath
+from urllib.parse import urlsplit
+
+from inline_markdown import extract_markdown_links
+from manifest import load_manifest, manifest_path
+
+
+def link_source(url, output):
+    """
+    Returns the source path, relative to the content directory, of the page
+    a link on the page at output points to, or None for other targets.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    if parts.path.startswith("/"):
+        relative = parts.path[1:]
+    else:
+        directory = posixpath.dirname(output.replace(os.sep, "/"))
+        relative = posixpath.join(directory, parts.path)
+    relative = posixpath.normpath(relative)
+    if relative == ".." or relative.startswith("../"):
+        return None
+    if relative.endswith(".html"):
+        relative = relative[: -len(".html")] + ".md"
+    elif not relative.endswith(".md"):
+        return None
+    return relative.replace("/", os.sep)
+
+
+def page_links(markdown, output):
+    """
+    Returns the [url, source] pairs of the pages whose titles the page at
+    output shows: the pages it links to with empty link text.
+    """
+    links = []
+    for text, url in extract_markdown_links(markdown):
+        if text:
+            continue
+        source = link_source(url, output)
+        if source is not None and [url, source] not in links:
+            links.append([url, source])
+    return links
+
+
+def reverse_links(entries):
+    """
+    Returns {source: [dependent sources]} for the title links of the
+    manifest entries.
+    """
+    dependents = {}
+    for key, entry in entries.items():
+        for _, source in entry["links"]:
+            dependents.setdefault(source, []).append(key)
+    return dependents
+
+
+def affected_pages(content_dir, public_dir, path):
+    """
+    Returns the sorted sources, relative to content_dir, of the pages the
+    last build would rebuild if the file at path changed, per the dependency
+    graph in the build manifest: every page using a template, or a page and
+    the pages showing its title.
+    """
+    entries = load_manifest(manifest_path(public_dir))
+    target = os.path.normpath(path)
+    affected = set()
+    for key, entry in entries.items():
+        template = entry["template"]
+        if template and os.path.normpath(template.rsplit(":", 1)[0]) == target:
+            affected.add(key)
+    content_root = os.path.join(os.path.normpath(content_dir), "")
+    if target.startswith(content_root):
+        key = target[len(content_root) :]
+        if key in entries:
+            affected.add(key)
+        affected.update(reverse_links(entries).get(key, ()))
+    return sorted(affected)
@@ -1,8 +1,49 @@
+TEXT_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTRIBUTE_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+)
+
+# Serialized props keyed by their items, so the same href or src on many
+# nodes is escaped and formatted once. Cleared when it reaches the limit.
+PROPS_CACHE = {}
+PROPS_CACHE_LIMIT = 4096
+
+
+def escape_text(text):
+    """
+    Escapes text for use as HTML element content. Text without special
+    characters is returned as is.
+    """
+    if "&" in text or "<" in text or ">" in text:
+        return text.translate(TEXT_ESCAPE_TABLE)
+    return text
+
+
+def escape_attribute(value):
+    """
+    Escapes a value for use inside a double-quoted HTML attribute.
+    """
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return value.translate(ATTRIBUTE_ESCAPE_TABLE)
+    return value
+
+
+def serialize_props(props):
+    """
+    Returns the attribute string of a props dict.
+    """
+    return "".join(
+        f' {prop}="{escape_attribute(str(value))}"' for prop, value in props.items()
+    )
+
+
 class HTMLNode:
     """
     Represents a Markdown node.
     """
 
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -10,14 +51,42 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        parts = []
+        self.emit_html(parts.append)
+        return "".join(parts)
+
+    def iter_html(self):
+        """
+        Yields the HTML of the node as a stream of string chunks.
+        """
+        raise NotImplementedError("to_html method not implemented")
+
+    def write_html(self, sink):
+        """
+        Writes the HTML of the node into a file-like sink.
+        """
+        self.emit_html(sink.write)
+
+    def emit_html(self, write):
+        """
+        Passes each string chunk of the node's HTML to write.
+        """
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self):
         if not self.props:
             return ""
-        props_text = ""
-        for prop, value in self.props.items():
-            props_text += f' {prop}="{value}"'
+        try:
+            key = tuple(self.props.items())
+            return PROPS_CACHE[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable values are serialized without the cache.
+            return serialize_props(self.props)
+        if len(PROPS_CACHE) >= PROPS_CACHE_LIMIT:
+            PROPS_CACHE.clear()
+        props_text = PROPS_CACHE[key] = serialize_props(self.props)
         return props_text
 
     def __repr__(self):
@@ -29,15 +98,24 @@ class LeafNode(HTMLNode):
     Represents an HTML end node.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
     def to_html(self):
         if self.value is None:
             raise ValueError("leaf node must have value")
-        elif self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        value = escape_text(self.value)
+        if self.tag is None:
+            return value
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
+
+    def emit_html(self, write):
+        write(self.to_html())
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
@@ -45,19 +123,53 @@ class LeafNode(HTMLNode):
 
 class ParentNode(HTMLNode):
     """
-    Represents HTML parent node.
+    Represents HTML parent node. Besides nodes, children may be strings of
+    ready HTML text, which are written into the output as they are.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def iter_html(self):
+        self.check_html()
+        yield f"<{self.tag}>"
+        for child in self.children:
+            if child.__class__ is str:
+                yield child
+            else:
+                yield from child.iter_html()
+        yield f"</{self.tag}>"
+
+    def emit_html(self, write):
+        self.check_html()
+        write(f"<{self.tag}>")
+        for child in self.children:
+            if child.__class__ is str:
+                write(child)
+            else:
+                child.emit_html(write)
+        write(f"</{self.tag}>")
+
+    def check_html(self):
         if not self.tag:
             raise ValueError("parent node must have tag")
         elif not self.children:
             raise ValueError("parent node must have children")
-        html_text = f"<{self.tag}>"
-        for child in self.children:
-            html_text += child.to_html()
-        html_text += f"</{self.tag}>"
-        return html_text
+
+
+class SafeLeafNode(LeafNode):
+    """
+    Represents an HTML end node whose value is known to need no escaping, so
+    serializing it skips the check.
+    """
+
+    __slots__ = ()
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError("leaf node must have value")
+        elif self.tag is None:
+            return self.value
+        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
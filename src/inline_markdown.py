@@ -3,20 +3,112 @@ import re
 from htmlnode import LeafNode
 from textnode import TextNode, TextType
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# Alternatives are tried in the same priority order as the old chain of
+# split passes: images, links, code, italic, bold. A delimiter that cannot
+# be paired falls through to the last group and is reported as unbalanced.
+INLINE_PATTERN = re.compile(
+    r"(?=[!\[`_*])(?:"
+    + IMAGE_PATTERN.pattern
+    + "|"
+    + LINK_PATTERN.pattern
+    + r"|`([^`]*)`"
+    r"|_([^_]*)_"
+    r"|\*\*([\s\S]*?)\*\*"
+    r"|([`_]|\*\*))"
+)
+# Indexed by the last matching group of INLINE_PATTERN.
+INLINE_TEXT_TYPES = (
+    None,
+    None,
+    TextType.IMAGE,
+    None,
+    TextType.LINK,
+    TextType.CODE,
+    TextType.ITALIC,
+    TextType.BOLD,
+)
+# Indexed like INLINE_TEXT_TYPES: the delimiters of the passes that ran
+# before each delimiter's own in the old chain.
+INLINE_EARLIER = (None,) * 5 + ((), ("`",), ("`", "_"))
+
+
+def _starts_within(text, start, end):
+    """
+    Returns whether an image or link of text starts between start and end.
+    """
+    for pattern in (IMAGE_PATTERN, LINK_PATTERN):
+        match = pattern.search(text, start)
+        if match and match.start() < end:
+            return True
+    return False
+
 
 def text_to_textnodes(text):
     """
-    Converts text to TextNodes
+    Converts text to TextNodes in a single left-to-right scan. Adjacent plain
+    runs, such as the two sides of an empty delimiter pair, become one node.
     """
-    new_nodes = [TextNode(text, TextType.TEXT)]
-    new_nodes = split_nodes_image(new_nodes)
-    new_nodes = split_nodes_link(new_nodes)
-    new_nodes = split_nodes_delimiter(new_nodes, "`", TextType.CODE)
-    new_nodes = split_nodes_delimiter(new_nodes, "_", TextType.ITALIC)
-    new_nodes = split_nodes_delimiter(new_nodes, "**", TextType.BOLD)
+    # Enum attribute lookups are slow enough to matter in this loop.
+    text_type_text = TextType.TEXT
+    text_types = INLINE_TEXT_TYPES
+    new_nodes = []
+    append = new_nodes.append
+    # The plain run being built: the text gathered before any empty
+    # delimiter pairs, and where its remaining text starts.
+    run = ""
+    run_start = 0
+    for match in INLINE_PATTERN.finditer(text):
+        start, end = match.span()
+        group = match.lastindex
+        if group == 8:
+            raise ValueError("unbalanced delimiters")
+        elif group < 5:
+            node = TextNode(match[group - 1], text_types[group], match[group])
+        elif match[group]:
+            content = match[group]
+            # The old chain split out images and links before any delimiter,
+            # then code, italic and bold in turn, so a delimiter of an
+            # earlier pass inside this span left that pass unbalanced.
+            if any(map(content.__contains__, INLINE_EARLIER[group])) or (
+                "[" in content
+                and _starts_within(text, match.start(group), match.end(group))
+            ):
+                raise ValueError("unbalanced delimiters")
+            node = TextNode(content, text_types[group])
+        else:
+            run += text[run_start:start]
+            run_start = end
+            continue
+        if run or start != run_start:
+            append(TextNode(run + text[run_start:start], text_type_text))
+            run = ""
+        append(node)
+        run_start = end
+    if run or run_start != len(text):
+        append(TextNode(run + text[run_start:], text_type_text))
     return new_nodes
 
 
+def merge_text_nodes(nodes):
+    """
+    Returns nodes with every run of adjacent Text nodes merged into one.
+    """
+    merged = []
+    for node in nodes:
+        if (
+            node.text_type == TextType.TEXT
+            and merged
+            and merged[-1].text_type == TextType.TEXT
+        ):
+            merged[-1] = TextNode(merged[-1].text + node.text, TextType.TEXT)
+        else:
+            merged.append(node)
+    return merged
+
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
     Splits Text nodes based on the given delimiter.s
@@ -36,58 +128,42 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
                     new_nodes.append(TextNode(parts[idx], text_type))
                 else:
                     new_nodes.append(TextNode(parts[idx], TextType.TEXT))
-    return new_nodes
+    # Empty delimiter pairs leave the Text parts around them side by side.
+    return merge_text_nodes(new_nodes)
 
 
 def split_nodes_link(old_nodes):
     """
     Split nodes around links.
     """
-    new_nodes = []
-    for old_node in old_nodes:
-        text = old_node.text
-        found_links = extract_markdown_links(text)
-        if found_links == []:
-            new_nodes.append(old_node)
-        else:
-            while found_links != []:
-                delimiter = f"[{found_links[0][0]}]({found_links[0][1]})"
-                split_text = text.split(delimiter, 1)
-                if split_text[0] != "":
-                    new_nodes.append(TextNode(split_text[0], TextType.TEXT))
-                new_nodes.append(
-                    TextNode(found_links[0][0], TextType.LINK, found_links[0][1])
-                )
-                text = split_text[1]
-                found_links = extract_markdown_links(text)
-            if text != "":
-                new_nodes.append(TextNode(text, TextType.TEXT))
-    return new_nodes
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
 
 
 def split_nodes_image(old_nodes):
     """
     Split nodes around image references.
     """
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
+
+def split_nodes_pattern(old_nodes, pattern, text_type):
+    """
+    Split nodes around (text, url) matches of pattern in one sweep per node.
+    """
     new_nodes = []
     for old_node in old_nodes:
         text = old_node.text
-        found_images = extract_markdown_images(text)
-        if found_images == []:
+        pos = 0
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if start != pos:
+                new_nodes.append(TextNode(text[pos:start], TextType.TEXT))
+            new_nodes.append(TextNode(match[1], text_type, match[2]))
+            pos = end
+        if pos == 0:
             new_nodes.append(old_node)
-        else:
-            while found_images != []:
-                delimiter = f"![{found_images[0][0]}]({found_images[0][1]})"
-                split_text = text.split(delimiter, 1)
-                if split_text[0] != "":
-                    new_nodes.append(TextNode(split_text[0], TextType.TEXT))
-                new_nodes.append(
-                    TextNode(found_images[0][0], TextType.IMAGE, found_images[0][1])
-                )
-                text = split_text[1]
-                found_images = extract_markdown_images(text)
-            if text != "":
-                new_nodes.append(TextNode(text, TextType.TEXT))
+        elif pos != len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
     return new_nodes
 
 
@@ -95,11 +171,11 @@ def extract_markdown_images(text):
     """
     Extract image alt text and link from Markdown.
     """
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
     """
     Extract alt text and link from Markdown.
     """
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return LINK_PATTERN.findall(text)
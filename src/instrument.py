@@ -0,0 +1,199 @@
+import json
+import os
+import time
+import types
+
+import block_cache
+import block_markdown
+import build
+from htmlnode import HTMLNode
+
+# (module or class, attribute, stage) wrapped while a Profiler is installed.
+# Functions are patched where they are looked up, so nothing is wrapped and
+# nothing costs extra while profiling is off.
+STAGE_TARGETS = (
+    (build, "render_page", "page"),
+    (block_markdown, "markdown_to_blocks", "markdown_to_blocks"),
+    (block_cache, "markdown_to_blocks", "markdown_to_blocks"),
+    (block_markdown, "block_to_block_type", "block_to_block_type"),
+    (block_markdown, "text_to_textnodes", "text_to_textnodes"),
+    (block_markdown, "text_part_to_html_node", "text_node_to_html_node"),
+    (HTMLNode, "to_html", "to_html"),
+    # The parse tree path of the block and parse caches renders each block,
+    # inline runs included, straight from its tree.
+    (block_markdown, "tree_block_to_html", "to_html"),
+    (HTMLNode, "write_html", "to_html"),
+)
+STAGES = (
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "text_node_to_html_node",
+    "to_html",
+)
+
+
+class Profiler:
+    """
+    Records wall time, call counts and produced node counts per build stage,
+    in total and for each rendered page.
+    """
+
+    def __init__(self):
+        self.stages = {stage: [0.0, 0, 0] for stage in ("page",) + STAGES}
+        self.pages = {}
+        self.current_page = None
+        self.depth = dict.fromkeys(self.stages, 0)
+        self.originals = []
+
+    def install(self):
+        """
+        Wraps every stage function with a timing wrapper.
+        """
+        for owner, name, stage in STAGE_TARGETS:
+            func = vars(owner)[name]
+            self.originals.append((owner, name, func))
+            wrapper = self.wrap(stage, func)
+            # cProfile keys functions by code object name, so every wrapper
+            # gets its own name to keep the call paths through them apart.
+            code = wrapper.__code__.replace(
+                co_name=f"profiled {owner.__name__}.{name}"
+            )
+            wrapper = types.FunctionType(
+                code, wrapper.__globals__, code.co_name, None, wrapper.__closure__
+            )
+            setattr(owner, name, wrapper)
+
+    def uninstall(self):
+        """
+        Restores the unwrapped stage functions.
+        """
+        for owner, name, func in reversed(self.originals):
+            setattr(owner, name, func)
+        self.originals = []
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def wrap(self, stage, func):
+        """
+        Returns func wrapped to record its time under stage.
+        """
+        timer = time.perf_counter
+        totals = self.stages[stage]
+        depth = self.depth
+
+        def wrapper(*args, **kwargs):
+            # Only the outermost call counts, so recursive to_html calls and
+            # to_html inside write_html are not timed twice.
+            if depth[stage]:
+                return func(*args, **kwargs)
+            if stage == "page":
+                self.current_page = dict.fromkeys(STAGES, 0.0)
+            depth[stage] += 1
+            start = timer()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = timer() - start
+                depth[stage] -= 1
+            totals[0] += elapsed
+            totals[1] += 1
+            totals[2] += len(result) if isinstance(result, list) else 1
+            if stage == "page":
+                self.current_page["total"] = elapsed
+                self.pages[args[0]] = self.current_page
+                self.current_page = None
+            elif self.current_page is not None:
+                self.current_page[stage] += elapsed
+            return result
+
+        return wrapper
+
+    def summary(self):
+        """
+        Returns the per-stage totals as a dict.
+        """
+        return {
+            stage: {"seconds": seconds, "calls": calls, "nodes": nodes}
+            for stage, (seconds, calls, nodes) in self.stages.items()
+        }
+
+    def slowest_pages(self, count):
+        """
+        Returns the count slowest (source, breakdown) pages.
+        """
+        pages = sorted(self.pages.items(), key=lambda item: -item[1]["total"])
+        return pages[:count]
+
+    def write(self, directory, stats, top=10):
+        """
+        Writes stages.json, pages.json, slowest.json and the collapsed stacks
+        of the pstats.Stats in stats into directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        outputs = (
+            ("stages.json", self.summary()),
+            ("pages.json", self.pages),
+            ("slowest.json", dict(self.slowest_pages(top))),
+        )
+        for filename, data in outputs:
+            path = os.path.join(directory, filename)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+        path = os.path.join(directory, "profile.folded")
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, micros in collapsed_stacks(stats):
+                file.write(f"{stack} {micros}\n")
+
+
+def collapsed_stacks(stats, max_depth=64, min_seconds=1e-6):
+    """
+    Yields (stack, microseconds) pairs in the collapsed-stack format of
+    flamegraph tools from a pstats.Stats. cProfile only keeps caller/callee
+    edges, so time is split across call paths in proportion to edge time.
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    folded = {}
+
+    def visit(func, path, fraction):
+        path = path + (func_label(func),)
+        self_time = entries[func][2] * fraction
+        if self_time > 0:
+            key = ";".join(path)
+            folded[key] = folded.get(key, 0) + self_time
+        if len(path) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = entries[callee][3]
+            # Paths that carry next to no time are pruned to keep the walk
+            # from exploding on densely connected call graphs.
+            if edge_time * fraction < min_seconds or func_label(callee) in path:
+                continue
+            visit(callee, path, fraction * edge_time / callee_total)
+
+    for root in roots:
+        visit(root, (), 1.0)
+    for stack, seconds in sorted(folded.items()):
+        micros = round(seconds * 1e6)
+        if micros:
+            yield stack, micros
+
+
+def func_label(func):
+    """
+    Returns a readable frame label for a pstats function key.
+    """
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
@@ -1,9 +1,482 @@
-from textnode import TextNode, TextType
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
 
+from assets import sync_assets
+from block_cache import BlockCache
+from build import build, find_pages
+from compress import precompress
+from daemon import run_daemon
+from depgraph import affected_pages
+from instrument import Profiler
+from merge import merge_shards
+from parse_store import ParseStore
+from pipeline import share_malloc_arena
+from search_index import build_search_index, index_shards
+from sitemap import write_site_files
+from watch import watch
 
-def main():
-    t = TextNode("This is some anchor text", TextType.LINK, "https://www.boot.dev")
-    print(t)
+DEFAULT_TEMPLATE = "template.html"
+DEFAULT_STATIC = "static"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Static site generator. Without a command, runs build."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    build_parser = subparsers.add_parser(
+        "build", help="render the content directory into the public directory"
+    )
+    add_build_arguments(build_parser)
+    watch_parser = subparsers.add_parser(
+        "watch", help="serve the site and re-render pages as they change"
+    )
+    add_site_arguments(watch_parser)
+    watch_parser.add_argument("--host", default="127.0.0.1")
+    watch_parser.add_argument("--port", type=int, default=8000)
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.05,
+        help="seconds between checks for changes (default: 0.05)",
+    )
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="render Markdown documents sent as JSON lines without restarting",
+    )
+    daemon_parser.add_argument(
+        "--socket",
+        default=None,
+        metavar="PATH",
+        help="listen on a Unix socket at PATH instead of stdin and stdout",
+    )
+    daemon_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of render processes (default: 1, render in-process)",
+    )
+    merge_parser = subparsers.add_parser(
+        "merge",
+        help="combine the staging directories of a sharded build; run build "
+        "over the merged output afterwards for the assets, search index, "
+        "sitemap, feeds and gzip copies, which shards skip",
+    )
+    merge_parser.add_argument(
+        "staging", nargs="+", metavar="STAGING", help="public directory of a shard"
+    )
+    merge_parser.add_argument(
+        "--public", default="public", help="HTML output directory"
+    )
+    deps_parser = subparsers.add_parser(
+        "deps", help="list the pages the last build would rebuild if PATH changed"
+    )
+    deps_parser.add_argument("path", metavar="PATH", help="page source or template")
+    add_site_arguments(deps_parser)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # The build options live on the build command alone, so that a missing
+    # command is build rather than a second parse of the same options.
+    if not argv or argv[0].startswith("-") and argv[0] not in ("-h", "--help"):
+        argv.insert(0, "build")
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        start = time.perf_counter()
+        try:
+            report = merge_shards(args.staging, args.public)
+        except ValueError as error:
+            parser.exit(1, f"error: {error}\n")
+        elapsed = time.perf_counter() - start
+        print(
+            f"Merged {len(report.rebuilt)}, skipped {len(report.skipped)} and "
+            f"removed {len(report.removed)} pages into {args.public} in "
+            f"{elapsed:.2f}s"
+        )
+        print(
+            "Run build with the same options to add the assets, search index, "
+            "sitemap, feeds and gzip copies; it renders no page again"
+        )
+        return
+
+    if args.command == "deps":
+        for source in affected_pages(args.content, args.public, args.path):
+            print(os.path.join(args.content, source))
+        return
+
+    if args.command == "daemon":
+        if args.workers < 1:
+            parser.exit(1, "error: workers must be positive\n")
+        run_daemon(args.socket, args.workers)
+        return
+
+    if args.command == "watch":
+        if not os.path.isdir(args.content):
+            parser.exit(1, f"error: content directory not found: {args.content}\n")
+        watch(
+            args.content,
+            args.public,
+            args.host,
+            args.port,
+            args.interval,
+            args.template,
+        )
+        return
+
+    cache = None
+    if args.block_cache or args.block_cache_bytes or args.block_cache_file:
+        cache = BlockCache(args.block_cache, args.block_cache_bytes)
+        if args.block_cache_file:
+            cache.load(args.block_cache_file)
+    store = ParseStore(args.parse_cache) if args.parse_cache else None
+    if cache is not None and store is not None:
+        # Pages are rendered from their stored trees, never through blocks.
+        parser.exit(1, "error: the block cache does not work with --parse-cache\n")
+    if cache is not None and args.memory_budget is not None:
+        parser.exit(1, "error: the block cache does not work with --memory-budget\n")
+    if args.profile and args.memory_budget is not None:
+        # The pipeline spreads a page over several threads, which the
+        # per-page timings cannot follow.
+        parser.exit(1, "error: --profile does not work with --memory-budget\n")
+
+    if args.single_arena:
+        share_malloc_arena()
+
+    profiler = profile = None
+    workers = args.workers
+    if args.profile:
+        # Stage wrappers and cProfile only see pages rendered in this process.
+        workers = 1
+        profiler = Profiler()
+        profiler.install()
+        profile = cProfile.Profile()
+        profile.enable()
+
+    # A shard only renders its share of the pages. Assets, the search index,
+    # feeds and compression are left to a build over the merged output.
+    whole_site = args.shard is None
+    if whole_site and args.static and os.path.isdir(args.content):
+        start = time.perf_counter()
+        # Assets are synced first, so a page never gets written through a
+        # hard link into the static directory.
+        pages = {dest for _, dest in find_pages(args.content, args.public)}
+        try:
+            report = sync_assets(
+                args.static,
+                args.public,
+                link=args.link_assets,
+                reserved=pages,
+                force=args.force,
+            )
+        except ValueError as error:
+            parser.exit(1, f"error: {error}\n")
+        elapsed = time.perf_counter() - start
+        print(
+            f"Synced {len(report.rebuilt)}, skipped {len(report.skipped)} and "
+            f"removed {len(report.removed)} assets in {elapsed:.2f}s"
+        )
+
+    start = time.perf_counter()
+    try:
+        report = build(
+            args.content,
+            args.public,
+            workers=workers,
+            force=args.force,
+            cache=cache,
+            template=args.template,
+            store=store,
+            shard=args.shard,
+            memory_budget=args.memory_budget,
+        )
+    except ValueError as error:
+        parser.exit(1, f"error: {error}\n")
+    finally:
+        if profiler is not None:
+            profile.disable()
+            profiler.uninstall()
+    elapsed = time.perf_counter() - start
+    print(
+        f"Rebuilt {len(report.rebuilt)}, skipped {len(report.skipped)} and "
+        f"removed {len(report.removed)} pages in {args.public} in {elapsed:.2f}s"
+    )
+    for stage, marks in report.stages.items():
+        name = stage if stage == "in flight" else f"{stage} queue"
+        print(
+            f"{name:>12}: peak {marks['peak_bytes'] / 1024:.0f} KiB in "
+            f"{marks['peak_items']} pages, blocked "
+            f"{marks['blocked_seconds']:.2f}s"
+        )
+    index_dir = os.path.join(args.public, "search")
+    if whole_site and args.search_index and (
+        report.rebuilt
+        or report.removed
+        or args.force
+        or index_shards(index_dir) != args.search_shards
+    ):
+        start = time.perf_counter()
+        try:
+            stats = build_search_index(
+                args.content,
+                args.public,
+                index_dir,
+                shards=args.search_shards,
+                workers=workers,
+            )
+        except ValueError as error:
+            parser.exit(1, f"error: {error}\n")
+        elapsed = time.perf_counter() - start
+        print(
+            f"Indexed {stats['terms']} terms in {stats['pages']} pages into "
+            f"{args.search_shards} shards in {elapsed:.2f}s"
+        )
+    if whole_site and args.site_url:
+        start = time.perf_counter()
+        report = write_site_files(
+            args.public,
+            args.site_url,
+            title=args.site_title,
+            feed_size=args.feed_size,
+            force=args.force,
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"Wrote {len(report.rebuilt)}, skipped {len(report.skipped)} and "
+            f"removed {len(report.removed)} sitemap and feed files in {elapsed:.2f}s"
+        )
+    if whole_site and args.gzip:
+        start = time.perf_counter()
+        try:
+            report = precompress(
+                args.public,
+                args.gzip_level,
+                args.gzip_min_size,
+                workers=args.workers,
+                force=args.force,
+            )
+        except ValueError as error:
+            parser.exit(1, f"error: {error}\n")
+        elapsed = time.perf_counter() - start
+        print(
+            f"Compressed {len(report.rebuilt)}, skipped {len(report.skipped)} and "
+            f"removed {len(report.removed)} files in {elapsed:.2f}s"
+        )
+    if cache is not None:
+        if args.block_cache_file:
+            cache.save(args.block_cache_file)
+        stats = ", ".join(f"{name} {value}" for name, value in cache.stats().items())
+        print(f"Block cache: {stats}")
+    if profiler is not None:
+        profiler.write(args.profile_output, pstats.Stats(profile), args.profile_top)
+        print_profile(profiler, args.profile_top)
+        print(f"Profile written to {args.profile_output}")
+
+
+def print_profile(profiler, top):
+    """
+    Prints the per-stage totals and the slowest pages of a profiled build.
+    """
+    for stage, totals in profiler.summary().items():
+        print(
+            f"{stage:>24}: {totals['seconds'] * 1000:10.2f} ms "
+            f"{totals['calls']:>9} calls {totals['nodes']:>9} nodes"
+        )
+    for source, breakdown in profiler.slowest_pages(top):
+        print(f"{breakdown['total'] * 1000:10.2f} ms  {source}")
+
+
+def size_argument(text):
+    """
+    Parses a byte count with an optional K, M or G suffix.
+    """
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    unit = units.get(text[-1:].upper(), 1)
+    try:
+        size = int(text[:-1] if unit > 1 else text) * unit
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a size like 64M: {text}") from None
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"size must be positive: {text}")
+    return size
+
+
+def shard_argument(text):
+    """
+    Parses an I/N shard option into an (index, count) pair.
+    """
+    try:
+        index, count = map(int, text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N: {text}") from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"expected 1 <= I <= N: {text}")
+    return index, count
+
+
+def add_site_arguments(parser):
+    """
+    Adds the content and public directory and template options.
+    """
+    parser.add_argument(
+        "--content", default="content", help="Markdown source directory"
+    )
+    parser.add_argument("--public", default="public", help="HTML output directory")
+    parser.add_argument(
+        "--template",
+        default=DEFAULT_TEMPLATE if os.path.isfile(DEFAULT_TEMPLATE) else None,
+        metavar="PATH",
+        help=f"layout wrapping every page (default: {DEFAULT_TEMPLATE} if present)",
+    )
+
+
+def add_build_arguments(parser):
+    """
+    Adds the options of the build command.
+    """
+    add_site_arguments(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of render processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild every page, ignoring the manifest"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=size_argument,
+        default=None,
+        metavar="SIZE",
+        help="render through read, parse, render and write stages holding at "
+        "most about SIZE bytes of pages in flight (suffixes K, M and G); a "
+        "page bigger than that waits to go alone",
+    )
+    parser.add_argument(
+        "--single-arena",
+        action="store_true",
+        help="make every thread of this process allocate from one glibc malloc "
+        "arena, so memory the stages free is reused and the peak stays closer "
+        "to --memory-budget",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_argument,
+        default=None,
+        metavar="I/N",
+        help="render only shard I of N, counted from 1, of the pages into the "
+        "public directory as staging for the merge command; assets, the search "
+        "index, sitemap, feeds and gzip copies are left to a build after merge",
+    )
+    parser.add_argument(
+        "--block-cache",
+        type=int,
+        default=None,
+        metavar="ENTRIES",
+        help="cache rendered blocks, keeping at most ENTRIES of them",
+    )
+    parser.add_argument(
+        "--block-cache-bytes",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="cache rendered blocks, keeping at most BYTES of HTML",
+    )
+    parser.add_argument(
+        "--block-cache-file",
+        default=None,
+        metavar="PATH",
+        help="load the block cache from PATH and save it back after the build",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        default=None,
+        metavar="DIR",
+        help="keep the parse tree of every page in DIR, so pages whose Markdown "
+        "did not change are not parsed again when they are rebuilt",
+    )
+    parser.add_argument(
+        "--static",
+        default=DEFAULT_STATIC if os.path.isdir(DEFAULT_STATIC) else None,
+        metavar="DIR",
+        help=f"asset directory copied into the public directory "
+        f"(default: {DEFAULT_STATIC} if present)",
+    )
+    parser.add_argument(
+        "--link-assets",
+        action="store_true",
+        help="hard-link assets into the public directory instead of copying",
+    )
+    parser.add_argument(
+        "--site-url",
+        default=None,
+        metavar="URL",
+        help="public URL of the site; writes sitemap.xml, atom.xml and rss.xml",
+    )
+    parser.add_argument(
+        "--site-title", default=None, help="feed title (default: the site URL)"
+    )
+    parser.add_argument(
+        "--feed-size",
+        type=int,
+        default=20,
+        metavar="N",
+        help="number of latest pages in the feeds (default: 20)",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="write a sharded full-text search index into the public "
+        "directory's search folder",
+    )
+    parser.add_argument(
+        "--search-shards",
+        type=int,
+        default=64,
+        metavar="N",
+        help="number of search index shards (default: 64)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write a precompressed .gz copy next to each HTML, CSS and other "
+        "text output",
+    )
+    parser.add_argument(
+        "--gzip-level",
+        type=int,
+        default=9,
+        metavar="LEVEL",
+        help="gzip compression level from 1 to 9 (default: 9)",
+    )
+    parser.add_argument(
+        "--gzip-min-size",
+        type=int,
+        default=1024,
+        metavar="BYTES",
+        help="leave files smaller than BYTES uncompressed (default: 1024)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="render in-process and record per-stage and per-page timings",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default="profile",
+        metavar="DIR",
+        help="directory for the profile reports (default: profile)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages to report (default: 10)",
+    )
 
 
 if __name__ == "__main__":
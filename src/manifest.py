@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 3
+
+
+def manifest_path(public_dir, suffix=".manifest.json"):
+    """
+    Returns the path of the build manifest kept next to public_dir. Other
+    stages keep their own manifests there under a different suffix.
+    """
+    return os.path.normpath(public_dir) + suffix
+
+
+def read_manifest(path):
+    """
+    Returns the whole manifest at path as a dict, or None when it is
+    missing, unreadable or outdated.
+    """
+    try:
+        with open(path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def load_manifest(path):
+    """
+    Returns the page entries of the manifest at path, keyed by source path.
+    A missing, unreadable or outdated manifest yields no entries.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        return {}
+    return manifest.get("pages", {})
+
+
+def save_manifest(path, pages, shard=None):
+    """
+    Atomically writes the page entries to the manifest at path. A sharded
+    build also records its shard: index, count and the entries of the pages
+    other shards render.
+    """
+    manifest = {"version": MANIFEST_VERSION, "pages": pages}
+    if shard is not None:
+        manifest["shard"] = shard
+    # One dumps and one write beat the many small writes of json.dump.
+    text = json.dumps(manifest, separators=(",", ":"))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        manifest_file.write(text)
+    os.replace(tmp_path, path)
+
+
+def file_hash(path):
+    """
+    Returns the SHA-256 hex digest of the file contents at path.
+    """
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
@@ -0,0 +1,103 @@
+import os
+
+from assets import copy_asset
+from build import BuildReport, remove_output
+from manifest import load_manifest, manifest_path, read_manifest, save_manifest
+
+
+def merge_shards(staging_dirs, public_dir):
+    """
+    Combines the staging directories of a sharded build into public_dir and
+    writes its manifest, as if one build had rendered every page. Outputs
+    already copied from the same shard file are left alone, and outputs of
+    pages that are gone are removed. Raises
+    ValueError when the shards do not fit together: shards missing or built
+    twice, a page rendered by two shards, shards that saw different content
+    trees or templates, or a listed output file missing from its shard.
+    Returns a BuildReport of output paths.
+    """
+    shards = {}
+    for staging_dir in staging_dirs:
+        path = manifest_path(staging_dir)
+        manifest = read_manifest(path)
+        if manifest is None or "shard" not in manifest:
+            raise ValueError(f"no shard manifest: {path}")
+        shard = manifest["shard"]
+        index = shard["index"]
+        if index in shards:
+            raise ValueError(
+                f"shard {index} given twice: {shards[index][0]} and {staging_dir}"
+            )
+        shards[index] = (staging_dir, manifest["pages"], shard)
+    counts = {shard["count"] for _, _, shard in shards.values()}
+    if len(counts) != 1:
+        raise ValueError(f"shards of different builds: counts {sorted(counts)}")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - shards.keys())
+    if missing:
+        raise ValueError(f"missing shards: {', '.join(map(str, missing))}")
+
+    entries = {}
+    owners = {}
+    for index in sorted(shards):
+        _, pages, _ = shards[index]
+        for key, entry in pages.items():
+            if key in owners:
+                raise ValueError(
+                    f"page built by shards {owners[key]} and {index}: {key}"
+                )
+            owners[key] = index
+            entries[key] = entry
+    for index, (_, pages, shard) in sorted(shards.items()):
+        seen = {**shard["others"], **pages}
+        if seen.keys() != entries.keys() or any(
+            entry["hash"] != entries[key]["hash"] for key, entry in seen.items()
+        ):
+            raise ValueError(f"shard {index} saw a different content tree")
+    templates = {entry["template"] for entry in entries.values()}
+    if len(templates) > 1:
+        raise ValueError("shards were built with different templates")
+
+    path = manifest_path(public_dir)
+    old_entries = load_manifest(path)
+    report = BuildReport()
+    made_dirs = set()
+    for key, entry in entries.items():
+        staging_dir = shards[owners[key]][0]
+        source = os.path.join(staging_dir, entry["output"])
+        dest = os.path.join(public_dir, entry["output"])
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            raise ValueError(
+                f"shard {owners[key]} lacks its output: {source}"
+            ) from None
+        # A shard only rewrites the pages it rebuilt, and copies keep the
+        # mtime, so a matching size and mtime means the page is unchanged.
+        try:
+            dest_stat = os.stat(dest)
+        except FileNotFoundError:
+            pass
+        else:
+            if (
+                dest_stat.st_size == stat.st_size
+                and dest_stat.st_mtime_ns == stat.st_mtime_ns
+            ):
+                report.skipped.append(dest)
+                continue
+        directory = os.path.dirname(dest)
+        if directory not in made_dirs:
+            os.makedirs(directory, exist_ok=True)
+            made_dirs.add(directory)
+        # Copies rather than hard links, since the next shard build writes
+        # its outputs in place.
+        copy_asset(source, dest, stat)
+        report.rebuilt.append(dest)
+    for key, entry in old_entries.items():
+        if key not in entries:
+            dest = os.path.join(public_dir, entry["output"])
+            remove_output(dest, public_dir)
+            report.removed.append(dest)
+    if entries != old_entries:
+        save_manifest(path, entries)
+    return report
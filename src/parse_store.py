@@ -0,0 +1,111 @@
+import hashlib
+import marshal
+import os
+import zlib
+
+import block_markdown
+import inline_markdown
+import textnode
+from block_markdown import markdown_to_tree, tree_to_html
+
+# Bump when the parse tree layout changes. Entries also go stale whenever
+# the source of a parser module changes, see parser_version.
+PARSE_STORE_VERSION = 1
+PARSER_MODULES = (block_markdown, inline_markdown, textnode)
+
+
+def parser_version():
+    """
+    Returns the version stamp of stored trees: the store version and a
+    digest of the parser module sources, so editing the parser invalidates
+    every entry without a manual bump.
+    """
+    digest = hashlib.blake2b(str(PARSE_STORE_VERSION).encode(), digest_size=16)
+    for module in PARSER_MODULES:
+        with open(module.__file__, "rb") as module_file:
+            digest.update(module_file.read())
+    return digest.hexdigest()
+
+
+class ParseStore:
+    """
+    Directory of parsed page trees, one zlib-compressed marshal file per
+    source content hash, so pages whose Markdown did not change skip parsing
+    and are only rendered again, as when just the layout changed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.version = parser_version()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".bin")
+
+    def load(self, key):
+        """
+        Returns the tree stored under key, or None when there is no readable
+        entry of the current parser version.
+        """
+        try:
+            with open(self.path(key), "rb") as tree_file:
+                version, tree = marshal.loads(zlib.decompress(tree_file.read()))
+        except (OSError, EOFError, ValueError, TypeError, zlib.error):
+            return None
+        if version != self.version:
+            return None
+        return tree
+
+    def save(self, key, tree):
+        """
+        Atomically stores tree under key.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Pages with the same content may be saved by two workers at once.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as tree_file:
+            tree_file.write(zlib.compress(marshal.dumps((self.version, tree)), 1))
+        os.replace(tmp_path, path)
+
+    def markdown_to_tree(self, markdown, key=None):
+        """
+        Returns the stored tree of a full Markdown document, parsing and
+        storing it on a miss. key defaults to the SHA-256 of the document,
+        as the build manifest hashes a source file.
+        """
+        if key is None:
+            key = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+        tree = self.load(key)
+        if tree is None:
+            self.misses += 1
+            tree = markdown_to_tree(markdown)
+            self.save(key, tree)
+        else:
+            self.hits += 1
+        return tree
+
+    def markdown_to_html(self, markdown, key=None):
+        """
+        Converts a full Markdown document into div HTML from its stored tree.
+        """
+        return tree_to_html(self.markdown_to_tree(markdown, key))
+
+    def prune(self, keys):
+        """
+        Deletes the entries whose key is not in keys and returns their count.
+        """
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return removed
+        with os.scandir(self.directory) as prefixes:
+            for prefix in prefixes:
+                if not prefix.is_dir():
+                    continue
+                with os.scandir(prefix.path) as entries:
+                    for entry in entries:
+                        if entry.name[: -len(".bin")] not in keys:
+                            os.remove(entry.path)
+                            removed += 1
+        return removed
@@ -0,0 +1,229 @@
+import ctypes
+import ctypes.util
+import threading
+import time
+from collections import deque
+
+# mallopt parameter of glibc for the number of malloc arenas.
+M_ARENA_MAX = -8
+
+
+class ByteQueue:
+    """
+    FIFO between two pipeline stages, bounded by the bytes of the items it
+    holds. put blocks while the item would take the queue over its limit,
+    but an empty queue always takes an item, so one bigger than the limit
+    still gets through. Records the high-water marks and the time producers
+    spent blocked.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.items = deque()
+        self.size = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.peak_bytes = 0
+        self.peak_items = 0
+        self.blocked = 0.0
+
+    def full(self, size):
+        return bool(self.items) and self.size + size > self.limit
+
+    def put(self, item, size):
+        """
+        Appends item, counted as size bytes, once there is room for it.
+        Returns False without appending when the queue was closed.
+        """
+        with self.condition:
+            if self.full(size) and not self.closed:
+                start = time.perf_counter()
+                while self.full(size) and not self.closed:
+                    self.condition.wait()
+                self.blocked += time.perf_counter() - start
+            if self.closed:
+                return False
+            self.items.append((item, size))
+            self.size += size
+            self.peak_bytes = max(self.peak_bytes, self.size)
+            self.peak_items = max(self.peak_items, len(self.items))
+            self.condition.notify_all()
+            return True
+
+    def get(self):
+        """
+        Removes and returns the oldest item, waiting for one. Returns None
+        once the queue is closed and empty.
+        """
+        with self.condition:
+            while not self.items and not self.closed:
+                self.condition.wait()
+            if not self.items:
+                return None
+            item, size = self.items.popleft()
+            self.size -= size
+            self.condition.notify_all()
+            return item
+
+    def close(self, drop=False):
+        """
+        Ends the stream: get drains what is left, or nothing with drop, and
+        then returns None, and put refuses new items.
+        """
+        with self.condition:
+            self.closed = True
+            if drop:
+                self.items.clear()
+                self.size = 0
+            self.condition.notify_all()
+
+    def stats(self):
+        return {
+            "peak_bytes": self.peak_bytes,
+            "peak_items": self.peak_items,
+            "blocked_seconds": self.blocked,
+        }
+
+
+class MemoryBudget:
+    """
+    Byte allowance shared by the items in flight through a pipeline. acquire
+    blocks while an item would take the total in use over the limit, and
+    an item bigger than the limit waits until nothing else is in flight,
+    so the limit bounds the total except while such an item goes alone.
+    Records the high-water marks and the time spent waiting.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.items = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.peak_bytes = 0
+        self.peak_items = 0
+        self.blocked = 0.0
+
+    def full(self, size):
+        return self.items > 0 and self.used + size > self.limit
+
+    def acquire(self, size):
+        """
+        Takes size bytes of the allowance once they are free. Returns False
+        without taking them when the budget was closed.
+        """
+        with self.condition:
+            if self.full(size) and not self.closed:
+                start = time.perf_counter()
+                while self.full(size) and not self.closed:
+                    self.condition.wait()
+                self.blocked += time.perf_counter() - start
+            if self.closed:
+                return False
+            self.used += size
+            self.items += 1
+            self.peak_bytes = max(self.peak_bytes, self.used)
+            self.peak_items = max(self.peak_items, self.items)
+            return True
+
+    def release(self, size):
+        with self.condition:
+            self.used -= size
+            self.items -= 1
+            self.condition.notify_all()
+
+    def close(self):
+        """
+        Wakes every waiting acquire, which then fails.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self):
+        return {
+            "peak_bytes": self.peak_bytes,
+            "peak_items": self.peak_items,
+            "blocked_seconds": self.blocked,
+        }
+
+
+def share_malloc_arena():
+    """
+    Makes every thread of the process allocate from one glibc malloc arena.
+    Otherwise each stage thread gets an arena of its own, which keeps the
+    memory freed by the pages it handled and adds megabytes the budget does
+    not see. This changes the allocator for the whole process, so only the
+    command line applies it, on request. Does nothing off glibc.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        libc.mallopt(M_ARENA_MAX, 1)
+    except (OSError, AttributeError, TypeError):
+        pass
+
+
+def run_pipeline(items, stages, memory_budget, weigh):
+    """
+    Passes items through (name, func) stages, each on its own thread. Every
+    stage but the last turns an item into an (item, size in bytes) pair for
+    the next one; the last stage consumes its items. An item takes weigh(item)
+    bytes of a MemoryBudget of memory_budget before the first stage and
+    gives them back once the last stage is done with it, so weigh should
+    bound the memory an item takes at any stage. An exception in any stage
+    stops them all and is raised here. Returns the stats of the budget under
+    "in flight", followed by those of the queue after each stage but the
+    last.
+    """
+    names = [name for name, _ in stages]
+    budget = MemoryBudget(memory_budget)
+    # The budget bounds what the queues hold, so they never block on it.
+    queues = [ByteQueue(memory_budget) for _ in stages[:-1]]
+    errors = []
+
+    def source():
+        for item in items:
+            size = weigh(item)
+            if not budget.acquire(size):
+                return
+            yield size, item
+
+    def run(idx, func):
+        inputs = source() if idx == 0 else iter(queues[idx - 1].get, None)
+        output = queues[idx] if idx < len(queues) else None
+        try:
+            for charge, item in inputs:
+                if output is None:
+                    func(item)
+                else:
+                    item, size = func(item)
+                    if not output.put((charge, item), size):
+                        break
+                # Drop the page before waiting for the next one, or it stays
+                # alive after the budget it took is given back.
+                del item
+                if output is None:
+                    budget.release(charge)
+        except BaseException as error:
+            errors.append(error)
+            # Unblock every other stage, so the pipeline winds down.
+            budget.close()
+            for queue in queues:
+                queue.close(drop=True)
+        else:
+            if output is not None:
+                output.close()
+
+    threads = [
+        threading.Thread(target=run, args=(idx, func), name=f"{name} stage")
+        for idx, (name, func) in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    stats = {"in flight": budget.stats()}
+    stats.update((name, queue.stats()) for name, queue in zip(names, queues))
+    return stats
@@ -0,0 +1,262 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from block_markdown import BlockType, block_to_block_type, markdown_to_blocks
+from build import find_pages
+from inline_markdown import text_to_textnodes
+from template import extract_title
+
+SEARCH_INDEX_VERSION = 1
+TOKEN_PATTERN = re.compile(r"\w{2,64}")
+BATCH_SIZE = 1000
+
+# The index directory holds manifest.json, docs.json with the [url, title]
+# of every page by document id, and shard-NNN.bin files. A term lives in
+# shard crc32(utf-8 term) % shards, so a browser fetches one shard per query
+# term. Shards list their terms in sorted order, each as:
+#   varint term length, UTF-8 term, varint posting count,
+#   then per posting a varint document id delta and a varint term frequency.
+
+
+def build_search_index(
+    content_dir,
+    public_dir,
+    index_dir=None,
+    shards=64,
+    workers=None,
+    batch_size=BATCH_SIZE,
+):
+    """
+    Writes a sharded inverted index of the text of every page under
+    content_dir into index_dir, public_dir/search by default. Pages are
+    tokenized in a process pool batch by batch and their postings spilled
+    to per-shard run files, so memory holds one batch and one shard at a
+    time. Returns the page, term and posting counts.
+    """
+    if shards < 1:
+        raise ValueError(f"shard count must be positive: {shards}")
+    if index_dir is None:
+        index_dir = os.path.join(public_dir, "search")
+    pages = find_pages(content_dir, public_dir)
+    public_prefix = len(os.path.join(public_dir, ""))
+    titles = []
+    stats = {"pages": len(pages), "terms": 0, "postings": 0}
+    parent = os.path.dirname(os.path.normpath(index_dir)) or "."
+    os.makedirs(parent, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=parent) as tmp_dir:
+        run_paths = [
+            os.path.join(tmp_dir, f"run-{shard:03}.txt") for shard in range(shards)
+        ]
+        runs = [open(path, "w", encoding="utf-8") for path in run_paths]
+        try:
+            results = index_pages(pages, workers, batch_size)
+            for doc_id, (title, terms) in enumerate(results):
+                for term, frequency in terms.items():
+                    shard = zlib.crc32(term.encode("utf-8")) % shards
+                    runs[shard].write(f"{term} {doc_id} {frequency}\n")
+                titles.append(title)
+        finally:
+            for run in runs:
+                run.close()
+
+        out_dir = os.path.join(tmp_dir, "index")
+        os.mkdir(out_dir)
+        for shard, run_path in enumerate(run_paths):
+            terms, postings = write_shard(
+                run_path, os.path.join(out_dir, f"shard-{shard:03}.bin")
+            )
+            os.remove(run_path)
+            stats["terms"] += terms
+            stats["postings"] += postings
+        docs = [
+            ["/" + dest[public_prefix:].replace(os.sep, "/"), title]
+            for (_, dest), title in zip(pages, titles)
+        ]
+        write_json(os.path.join(out_dir, "docs.json"), docs)
+        manifest = {
+            "version": SEARCH_INDEX_VERSION,
+            "shards": shards,
+            "shard_hash": "crc32",
+            "pages": stats["pages"],
+            "terms": stats["terms"],
+        }
+        write_json(os.path.join(out_dir, "manifest.json"), manifest)
+        if os.path.isdir(index_dir):
+            shutil.rmtree(index_dir)
+        os.replace(out_dir, index_dir)
+    return stats
+
+
+def index_shards(index_dir):
+    """
+    Returns the shard count of the index in index_dir, or None when there is
+    no readable index of this version.
+    """
+    try:
+        with open(os.path.join(index_dir, "manifest.json"), encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != SEARCH_INDEX_VERSION:
+        return None
+    return manifest.get("shards")
+
+
+def write_json(path, data):
+    """
+    Writes data as compact JSON to path.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(json.dumps(data, separators=(",", ":")))
+
+
+def index_pages(pages, workers=None, batch_size=BATCH_SIZE):
+    """
+    Yields the (title, term frequencies) of (source, dest) pages in order.
+    """
+    sources = [source for source, _ in pages]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sources) <= 1:
+        yield from map(page_terms, sources)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Submitting a batch at a time bounds the results waiting in memory.
+        for start in range(0, len(sources), batch_size):
+            batch = sources[start : start + batch_size]
+            chunksize = max(1, len(batch) // (workers * 4))
+            yield from executor.map(page_terms, batch, chunksize=chunksize)
+
+
+def page_terms(source):
+    """
+    Returns the title of a Markdown page and the frequency of every term in
+    the text nodes of its blocks. Code blocks are not indexed.
+    """
+    with open(source, encoding="utf-8") as source_file:
+        markdown = source_file.read()
+    terms = {}
+    for block in markdown_to_blocks(markdown):
+        if block_to_block_type(block) == BlockType.CODE:
+            continue
+        try:
+            text_nodes = text_to_textnodes(block)
+        except ValueError as error:
+            raise ValueError(f"{source}: {error}") from error
+        for text_node in text_nodes:
+            for term in TOKEN_PATTERN.findall(text_node.text.lower()):
+                terms[term] = terms.get(term, 0) + 1
+    title = extract_title(markdown, os.path.basename(source)[: -len(".md")])
+    return title, terms
+
+
+def write_shard(run_path, shard_path):
+    """
+    Merges the "term doc frequency" lines of a run file into a shard file
+    and returns its term and posting counts.
+    """
+    postings = {}
+    with open(run_path, encoding="utf-8") as run:
+        for line in run:
+            term, doc_id, frequency = line.split()
+            postings.setdefault(term, []).append((int(doc_id), int(frequency)))
+    out = bytearray()
+    count = 0
+    for term in sorted(postings):
+        encoded = term.encode("utf-8")
+        term_postings = postings[term]
+        write_varint(out, len(encoded))
+        out += encoded
+        write_varint(out, len(term_postings))
+        previous = 0
+        # Runs are written in document order, so the deltas are positive.
+        for doc_id, frequency in term_postings:
+            write_varint(out, doc_id - previous)
+            write_varint(out, frequency)
+            previous = doc_id
+        count += len(term_postings)
+    with open(shard_path, "wb") as shard_file:
+        shard_file.write(out)
+    return len(postings), count
+
+
+def write_varint(out, value):
+    """
+    Appends value to the bytearray out as an unsigned LEB128 varint.
+    """
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """
+    Returns the varint in data at pos and the position after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def read_shard(path):
+    """
+    Returns {term: [(doc id, frequency), ...]} from a shard file.
+    """
+    with open(path, "rb") as shard_file:
+        data = shard_file.read()
+    postings = {}
+    pos = 0
+    while pos < len(data):
+        length, pos = read_varint(data, pos)
+        term = data[pos : pos + length].decode("utf-8")
+        pos += length
+        count, pos = read_varint(data, pos)
+        doc_id = 0
+        term_postings = []
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            frequency, pos = read_varint(data, pos)
+            doc_id += delta
+            term_postings.append((doc_id, frequency))
+        postings[term] = term_postings
+    return postings
+
+
+def search(index_dir, query):
+    """
+    Returns the [url, title] of the pages containing every term of query,
+    most frequent matches first, reading only the shards of those terms.
+    """
+    with open(os.path.join(index_dir, "manifest.json"), encoding="utf-8") as file:
+        manifest = json.load(file)
+    if manifest.get("version") != SEARCH_INDEX_VERSION:
+        raise ValueError(f"unsupported search index: {index_dir}")
+    scores = None
+    for term in set(TOKEN_PATTERN.findall(query.lower())):
+        shard = zlib.crc32(term.encode("utf-8")) % manifest["shards"]
+        shard_path = os.path.join(index_dir, f"shard-{shard:03}.bin")
+        term_postings = dict(read_shard(shard_path).get(term, ()))
+        if scores is None:
+            scores = term_postings
+        else:
+            scores = {
+                doc_id: score + term_postings[doc_id]
+                for doc_id, score in scores.items()
+                if doc_id in term_postings
+            }
+    if not scores:
+        return []
+    with open(os.path.join(index_dir, "docs.json"), encoding="utf-8") as file:
+        docs = json.load(file)
+    ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+    return [docs[doc_id] for doc_id in ranked]
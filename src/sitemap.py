@@ -0,0 +1,197 @@
+import hashlib
+import heapq
+import itertools
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from urllib.parse import quote
+
+from build import BuildReport
+from htmlnode import escape_attribute, escape_text
+from manifest import load_manifest, manifest_path, save_manifest
+
+# The sitemap protocol allows at most 50,000 URLs per sitemap file.
+SITEMAP_LIMIT = 50_000
+SITEMAP_MANIFEST_SUFFIX = ".sitemap.json"
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def write_site_files(
+    public_dir,
+    site_url,
+    title=None,
+    feed_size=20,
+    limit=SITEMAP_LIMIT,
+    force=False,
+):
+    """
+    Writes sitemap.xml, split into a sitemap index over sitemap-N.xml files
+    past limit URLs, and the atom.xml and rss.xml feeds of the feed_size
+    latest pages into public_dir from the build manifest. Entries are
+    streamed into each file, at most limit of them at a time, and files
+    whose entries did not change since the last run are left alone. Returns
+    a BuildReport of the file paths.
+    """
+    site_url = site_url.rstrip("/")
+    entries = load_manifest(manifest_path(public_dir))
+    state_path = manifest_path(public_dir, SITEMAP_MANIFEST_SUFFIX)
+    old_state = {} if force else load_manifest(state_path)
+    state = {}
+    report = BuildReport()
+
+    def update(name, digest, write):
+        path = os.path.join(public_dir, name)
+        state[name] = digest
+        if old_state.get(name) == digest and os.path.exists(path):
+            report.skipped.append(path)
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            write(file)
+        os.replace(tmp_path, path)
+        report.rebuilt.append(path)
+
+    os.makedirs(public_dir, exist_ok=True)
+    if len(entries) <= limit:
+        chunk = entries.items()
+        update(
+            "sitemap.xml",
+            entries_digest(site_url, chunk),
+            lambda file: write_urlset(file, site_url, chunk),
+        )
+    else:
+        sitemaps = []
+        pages = iter(entries.items())
+        while chunk := list(itertools.islice(pages, limit)):
+            name = f"sitemap-{len(sitemaps) + 1}.xml"
+            sitemaps.append((name, max(entry["mtime_ns"] for _, entry in chunk)))
+            update(
+                name,
+                entries_digest(site_url, chunk),
+                lambda file, chunk=chunk: write_urlset(file, site_url, chunk),
+            )
+        update(
+            "sitemap.xml",
+            hashlib.blake2b(repr((site_url, sitemaps)).encode()).hexdigest(),
+            lambda file: write_sitemap_index(file, site_url, sitemaps),
+        )
+
+    title = title or site_url
+    latest = heapq.nlargest(
+        feed_size, entries.items(), key=lambda page: page[1]["mtime_ns"]
+    )
+    digest = entries_digest(site_url + "\n" + title, latest)
+    for name, write_feed in (("atom.xml", write_atom), ("rss.xml", write_rss)):
+        update(
+            name,
+            digest,
+            lambda file, write_feed=write_feed: write_feed(
+                file, site_url, title, latest
+            ),
+        )
+
+    for name in old_state.keys() - state.keys():
+        path = os.path.join(public_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            report.removed.append(path)
+    if state != old_state:
+        save_manifest(state_path, state)
+    return report
+
+
+def entries_digest(key, pages):
+    """
+    Returns a digest of key and the output, hash and mtime of (source,
+    entry) pages, which changes whenever a file listing them would.
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"))
+    for _, entry in pages:
+        line = f"{entry['output']}\t{entry['hash']}\t{entry['mtime_ns']}\n"
+        digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def page_url(site_url, output):
+    """
+    Returns the absolute URL of an output path relative to public_dir.
+    """
+    return site_url + "/" + quote(output.replace(os.sep, "/"))
+
+
+def timestamp(mtime_ns):
+    """
+    Returns the UTC datetime of an mtime in nanoseconds.
+    """
+    return datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc)
+
+
+def write_urlset(file, site_url, pages):
+    """
+    Streams a sitemap of (source, entry) pages into file.
+    """
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write(f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n')
+    for _, entry in pages:
+        url = escape_text(page_url(site_url, entry["output"]))
+        lastmod = timestamp(entry["mtime_ns"]).isoformat()
+        file.write(f"<url><loc>{url}</loc><lastmod>{lastmod}</lastmod></url>\n")
+    file.write("</urlset>\n")
+
+
+def write_sitemap_index(file, site_url, sitemaps):
+    """
+    Streams a sitemap index of (name, latest mtime) sitemaps into file.
+    """
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write(f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n')
+    for name, mtime_ns in sitemaps:
+        url = escape_text(page_url(site_url, name))
+        lastmod = timestamp(mtime_ns).isoformat()
+        file.write(
+            f"<sitemap><loc>{url}</loc><lastmod>{lastmod}</lastmod></sitemap>\n"
+        )
+    file.write("</sitemapindex>\n")
+
+
+def write_atom(file, site_url, title, pages):
+    """
+    Streams an Atom feed of (source, entry) pages, newest first, into file.
+    """
+    updated = timestamp(pages[0][1]["mtime_ns"] if pages else 0).isoformat()
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+    file.write(f"<title>{escape_text(title)}</title>\n")
+    file.write(f"<id>{escape_text(site_url)}/</id>\n")
+    file.write(f'<link href="{escape_attribute(site_url)}/"/>\n')
+    file.write(f"<updated>{updated}</updated>\n")
+    for _, entry in pages:
+        url = escape_attribute(page_url(site_url, entry["output"]))
+        file.write(
+            f"<entry><title>{escape_text(entry['title'])}</title>"
+            f'<link href="{url}"/><id>{url}</id>'
+            f"<updated>{timestamp(entry['mtime_ns']).isoformat()}</updated>"
+            "</entry>\n"
+        )
+    file.write("</feed>\n")
+
+
+def write_rss(file, site_url, title, pages):
+    """
+    Streams an RSS 2.0 feed of (source, entry) pages, newest first, into
+    file.
+    """
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write('<rss version="2.0"><channel>\n')
+    file.write(f"<title>{escape_text(title)}</title>\n")
+    file.write(f"<link>{escape_text(site_url)}/</link>\n")
+    file.write(f"<description>{escape_text(title)}</description>\n")
+    for _, entry in pages:
+        url = escape_text(page_url(site_url, entry["output"]))
+        published = format_datetime(timestamp(entry["mtime_ns"]), usegmt=True)
+        file.write(
+            f"<item><title>{escape_text(entry['title'])}</title>"
+            f"<link>{url}</link><guid>{url}</guid>"
+            f"<pubDate>{published}</pubDate></item>\n"
+        )
+    file.write("</channel></rss>\n")
@@ -0,0 +1,91 @@
+import os
+import re
+
+from block_markdown import BlockType, block_to_block_type, markdown_to_blocks
+from inline_markdown import text_to_textnodes
+
+PLACEHOLDER_PATTERN = re.compile(r"{{\s*(\w+)\s*}}")
+
+# Compiled templates of this process keyed by path, with the file mtime they
+# were compiled from.
+TEMPLATE_CACHE = {}
+
+
+class Template:
+    """
+    A layout split once into literal segments and named placeholders.
+    """
+
+    def __init__(self, text):
+        self.parts = []
+        self.slots = []
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.parts.append(text[pos : match.start()])
+            self.slots.append((len(self.parts), match[1]))
+            self.parts.append(None)
+            pos = match.end()
+        self.parts.append(text[pos:])
+        self.names = {name for _, name in self.slots}
+
+    def render(self, values):
+        """
+        Returns the template filled with values in a single join.
+        """
+        parts = self.parts[:]
+        for idx, name in self.slots:
+            parts[idx] = self.value(values, name)
+        return "".join(parts)
+
+    def write(self, sink, values):
+        """
+        Writes the filled template into a file-like sink. HTMLNode values are
+        streamed with write_html instead of being serialized first.
+        """
+        write = sink.write
+        slots = iter(self.slots)
+        for part in self.parts:
+            if part is not None:
+                write(part)
+                continue
+            value = self.value(values, next(slots)[1])
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.write_html(sink)
+
+    def value(self, values, name):
+        try:
+            return values[name]
+        except KeyError:
+            raise ValueError(f"missing template value: {name}") from None
+
+
+def load_template(path):
+    """
+    Returns the compiled template at path, compiling it again only when the
+    file has changed since it was last loaded in this process.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = TEMPLATE_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, encoding="utf-8") as template_file:
+        template = Template(template_file.read())
+    TEMPLATE_CACHE[path] = (mtime, template)
+    return template
+
+
+def extract_title(markdown, default=""):
+    """
+    Returns the plain text of the first h1 heading block of a Markdown
+    document, without its inline markup, or default when it has none.
+    """
+    for block in markdown_to_blocks(markdown):
+        if block.startswith("# ") and block_to_block_type(block) == BlockType.HEADING:
+            text = " ".join(block[2:].split())
+            try:
+                return "".join(node.text for node in text_to_textnodes(text)) or default
+            except ValueError:
+                return text
+    return default
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import assets
+from assets import copy_file, find_assets, sync_assets
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write("styles.css", "body { color: red; }")
+        self.write(os.path.join("images", "logo.svg"), "<svg></svg>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.static, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, relative):
+        with open(os.path.join(self.public, relative), encoding="utf-8") as file:
+            return file.read()
+
+    def test_find_assets(self):
+        self.assertEqual(
+            [path for path, _ in find_assets(self.static)],
+            [
+                os.path.join(self.static, "images", "logo.svg"),
+                os.path.join(self.static, "styles.css"),
+            ],
+        )
+
+    def test_sync(self):
+        report = sync_assets(self.static, self.public)
+        self.assertEqual(len(report.rebuilt), 2)
+        self.assertEqual(self.read("styles.css"), "body { color: red; }")
+        self.assertEqual(self.read(os.path.join("images", "logo.svg")), "<svg></svg>")
+        source = os.stat(os.path.join(self.static, "styles.css"))
+        dest = os.stat(os.path.join(self.public, "styles.css"))
+        self.assertEqual(dest.st_mtime_ns, source.st_mtime_ns)
+        self.assertNotEqual(dest.st_ino, source.st_ino)
+
+    def test_sync_skips_unchanged(self):
+        sync_assets(self.static, self.public)
+        report = sync_assets(self.static, self.public)
+        self.assertEqual(report.rebuilt, [])
+        self.assertEqual(len(report.skipped), 2)
+
+    def test_sync_copies_changed(self):
+        sync_assets(self.static, self.public)
+        path = os.path.join(self.static, "styles.css")
+        self.write("styles.css", "body { color: blue; }")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        report = sync_assets(self.static, self.public)
+        self.assertEqual(report.rebuilt, [os.path.join(self.public, "styles.css")])
+        self.assertEqual(self.read("styles.css"), "body { color: blue; }")
+
+    def test_sync_removes_stale(self):
+        sync_assets(self.static, self.public)
+        os.remove(os.path.join(self.static, "images", "logo.svg"))
+        report = sync_assets(self.static, self.public)
+        dest = os.path.join(self.public, "images", "logo.svg")
+        self.assertEqual(report.removed, [dest])
+        self.assertFalse(os.path.exists(os.path.dirname(dest)))
+
+    def test_sync_link(self):
+        sync_assets(self.static, self.public, link=True)
+        source = os.stat(os.path.join(self.static, "styles.css"))
+        dest = os.stat(os.path.join(self.public, "styles.css"))
+        self.assertEqual(dest.st_ino, source.st_ino)
+        report = sync_assets(self.static, self.public, link=True)
+        self.assertEqual(report.rebuilt, [])
+
+    def test_sync_replaces_link_without_writing_through(self):
+        sync_assets(self.static, self.public, link=True)
+        self.write("styles.css", "body { color: blue; }")
+        sync_assets(self.static, self.public, force=True)
+        self.write("styles.css", "body { color: green; }")
+        self.assertEqual(self.read("styles.css"), "body { color: blue; }")
+
+    def test_sync_reserved(self):
+        reserved = {os.path.join(self.public, "styles.css")}
+        with self.assertRaisesRegex(ValueError, "overwrite a page"):
+            sync_assets(self.static, self.public, reserved=reserved)
+
+    def test_sync_missing_static(self):
+        with self.assertRaises(ValueError):
+            sync_assets(os.path.join(self.tmp.name, "missing"), self.public)
+
+    def test_copy_file_fallback(self):
+        source = os.path.join(self.static, "styles.css")
+        dest = os.path.join(self.tmp.name, "copy.css")
+        with mock.patch.object(
+            assets.os, "copy_file_range", side_effect=OSError, create=True
+        ):
+            copy_file(source, dest)
+        with open(dest, encoding="utf-8") as file:
+            self.assertEqual(file.read(), "body { color: red; }")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from block_markdown import markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertEqual(cache.block_to_html("**shared**"), "<p><b>shared</b></p>")
+        self.assertEqual(cache.block_to_html("**shared**"), "<p><b>shared</b></p>")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_markdown_to_html(self):
+        markdown = "# Title\n\nSome _text_\n\n- one\n- two\n\nSome _text_"
+        cache = BlockCache()
+        self.assertEqual(
+            cache.markdown_to_html(markdown), markdown_to_html_node(markdown).to_html()
+        )
+        self.assertEqual(cache.hits, 1)
+
+    def test_markdown_to_html_empty(self):
+        self.assertEqual(BlockCache().markdown_to_html(""), "<div></div>")
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = BlockCache(max_entries=2)
+        cache.block_to_html("first")
+        cache.block_to_html("second")
+        cache.block_to_html("first")
+        cache.block_to_html("third")
+        self.assertEqual(cache.evictions, 1)
+        cache.block_to_html("first")
+        self.assertEqual(cache.hits, 2)
+        cache.block_to_html("second")
+        self.assertEqual(cache.misses, 4)
+
+    def test_evicts_over_bytes(self):
+        cache = BlockCache(max_bytes=20)
+        cache.block_to_html("aaaaaaaa")
+        cache.block_to_html("bbbbbbbb")
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.stats()["bytes"], len("<p>bbbbbbbb</p>"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_save_and_load(self):
+        cache = BlockCache()
+        cache.block_to_html("persisted block")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.cache")
+            cache.save(path)
+            loaded = BlockCache()
+            loaded.load(path)
+        self.assertEqual(loaded.block_to_html("persisted block"), "<p>persisted block</p>")
+        self.assertEqual(loaded.hits, 1)
+
+    def test_load_missing(self):
+        cache = BlockCache()
+        cache.load(os.path.join(tempfile.gettempdir(), "missing-blocks.cache"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_merge_updates(self):
+        worker = BlockCache()
+        worker.track_added()
+        worker.block_to_html("from worker")
+        worker.block_to_html("from worker")
+        parent = BlockCache()
+        parent.merge_updates(worker.take_updates())
+        self.assertEqual(parent.stats()["entries"], 1)
+        self.assertEqual(parent.hits, 1)
+        self.assertEqual(parent.misses, 1)
+        self.assertEqual(worker.take_updates(), ([], 0, 0))
+
+    def test_merge_updates_counts_parent_evictions(self):
+        worker = BlockCache(max_entries=1)
+        worker.track_added()
+        for block in ("first", "second", "third"):
+            worker.block_to_html(block)
+        self.assertEqual(worker.evictions, 2)
+        parent = BlockCache(max_entries=1)
+        parent.merge_updates(worker.take_updates())
+        self.assertEqual(parent.stats()["misses"], 3)
+        self.assertEqual(parent.stats()["evictions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,19 @@
+import io
+import mmap
+import tempfile
 import unittest
 
-from block_markdown import BlockType, block_to_block_type, markdown_to_blocks
+from block_markdown import (
+    BlockType,
+    block_to_block_type,
+    iter_markdown_blocks,
+    markdown_to_blocks,
+    markdown_to_html,
+    markdown_to_html_node,
+    text_to_children,
+)
+from corpus import generate_corpus
+from htmlnode import LeafNode
 
 
 class TestBlockMarkdown(unittest.TestCase):
@@ -31,6 +44,29 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_iter_markdown_blocks_text(self):
+        markdown = "# Title\n\n\nfirst  \nparagraph\n\n\n\n- a\n- b\n"
+        for chunk_size in (1, 2, 5, 1 << 16):
+            blocks = iter_markdown_blocks(io.StringIO(markdown), chunk_size)
+            self.assertEqual(list(blocks), markdown_to_blocks(markdown))
+
+    def test_iter_markdown_blocks_binary(self):
+        markdown = "caf\u00e9 au lait\n\n> na\u00efve\n\n"
+        blocks = iter_markdown_blocks(io.BytesIO(markdown.encode("utf-8")), 3)
+        self.assertEqual(list(blocks), markdown_to_blocks(markdown))
+
+    def test_iter_markdown_blocks_mmap(self):
+        markdown = "# Title\n\nSome paragraph\n\n```\ncode\n```\n" * 100
+        with tempfile.TemporaryFile() as file:
+            file.write(markdown.encode("utf-8"))
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                blocks = list(iter_markdown_blocks(mapped, 64))
+        self.assertEqual(blocks, markdown_to_blocks(markdown))
+
+    def test_iter_markdown_blocks_empty(self):
+        self.assertEqual(list(iter_markdown_blocks(io.StringIO(""))), [])
+
     def test_block_to_block_type_heading(self):
         block = "### HEADING"
         self.assertEqual(block_to_block_type(block), BlockType.HEADING)
@@ -87,6 +123,16 @@ line2
 - element3"""
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_block_to_block_type_mixed_markers_unordered_list(self):
+        block = """* element1
++ element2
+- element3"""
+        self.assertEqual(block_to_block_type(block), BlockType.UNORDERED_LIST)
+
+    def test_block_to_block_type_trailing_newline_unordered_list(self):
+        block = "- element1\n- element2\n"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
     def test_block_to_block_type_ordered_list(self):
         block = """1. first
  2. second
@@ -111,6 +157,106 @@ second
   3.third"""
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_block_to_block_type_indented_ordered_list(self):
+        block = """  1. first
+  2. second"""
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+    def test_block_to_block_type_empty(self):
+        self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
+
     def test_block_to_block_type_paragraph(self):
         block = "test string"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_markdown_to_html_node_paragraphs(self):
+        markdown = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+"""
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<p>This is another paragraph with <i>italic</i> text and "
+            "<code>code</code> here</p></div>",
+        )
+
+    def test_markdown_to_html_node_code(self):
+        markdown = """```python
+This is text that _should_ remain
+the **same** even with inline stuff
+```"""
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><pre><code>This is text that _should_ remain\n"
+            "the **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_markdown_to_html_node_escaped(self):
+        markdown = """Use <b> & [links](/a?b=1&c="2")
+
+```
+if a < b:
+```"""
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><p>Use &lt;b&gt; &amp; "
+            '<a href="/a?b=1&amp;c=&quot;2&quot;">links</a></p>'
+            "<pre><code>if a &lt; b:\n</code></pre></div>",
+        )
+
+    def test_markdown_to_html_matches_nodes(self):
+        documents = [markdown for _, markdown in generate_corpus(pages=5)]
+        documents.append("Use <b> & [links](/a?b=1&c=\"2\")\n\n```\nif a < b:\n```")
+        for markdown in documents:
+            self.assertEqual(
+                markdown_to_html(markdown), markdown_to_html_node(markdown).to_html()
+            )
+
+    def test_markdown_to_html_empty(self):
+        for markdown in ("", " \n\n\t\n"):
+            with self.subTest(markdown=markdown):
+                self.assertEqual(markdown_to_html(markdown), "<div></div>")
+                self.assertEqual(
+                    markdown_to_html_node(markdown).to_html(), "<div></div>"
+                )
+
+    def test_empty_block_text(self):
+        cases = {
+            ">": "<div><blockquote></blockquote></div>",
+            "a\n\n``": "<div><p>a</p><p></p></div>",
+            "- a\n- ``": "<div><ul><li>a</li><li></li></ul></div>",
+            "## ``": "<div><h2></h2></div>",
+        }
+        for markdown, html in cases.items():
+            self.assertEqual(markdown_to_html_node(markdown).to_html(), html)
+            self.assertEqual(markdown_to_html(markdown), html)
+
+    def test_text_to_children_inline_text(self):
+        children = text_to_children("a `` b **c** & d")
+        self.assertEqual(children[0], "a  b ")
+        self.assertIsInstance(children[1], LeafNode)
+        self.assertEqual(children[2], " &amp; d")
+
+    def test_markdown_to_html_node_blocks(self):
+        markdown = """## Heading with `code`
+
+> quoted
+> _text_
+
+- first
+- second
+
+1. one
+2. two
+"""
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><h2>Heading with <code>code</code></h2>"
+            "<blockquote>quoted <i>text</i></blockquote>"
+            "<ul><li>first</li><li>second</li></ul>"
+            "<ol><li>one</li><li>two</li></ol></div>",
+        )
@@ -0,0 +1,211 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from block_cache import BlockCache
+from build import build, find_pages
+from main import main
+
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write("index.md", "# Home\n\nWelcome **home**")
+        self.write(os.path.join("blog", "post.md"), "- one\n- two")
+        self.write(os.path.join("blog", "notes.txt"), "not markdown")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, relative):
+        with open(os.path.join(self.public, relative), encoding="utf-8") as file:
+            return file.read()
+
+    def test_find_pages(self):
+        pages = find_pages(self.content, self.public)
+        self.assertEqual(
+            pages,
+            [
+                (
+                    os.path.join(self.content, "index.md"),
+                    os.path.join(self.public, "index.html"),
+                ),
+                (
+                    os.path.join(self.content, "blog", "post.md"),
+                    os.path.join(self.public, "blog", "post.html"),
+                ),
+            ],
+        )
+
+    def test_build_serial(self):
+        report = build(self.content, self.public, workers=1)
+        self.assertEqual(len(report.rebuilt), 2)
+        self.assertEqual(
+            self.read("index.html"),
+            "<div><h1>Home</h1><p>Welcome <b>home</b></p></div>",
+        )
+        self.assertEqual(
+            self.read(os.path.join("blog", "post.html")),
+            "<div><ul><li>one</li><li>two</li></ul></div>",
+        )
+
+    def test_build_process_pool(self):
+        build(self.content, self.public, workers=2)
+        self.assertEqual(
+            self.read(os.path.join("blog", "post.html")),
+            "<div><ul><li>one</li><li>two</li></ul></div>",
+        )
+
+    def test_build_block_cache(self):
+        self.write("about.md", "# Home\n\nWelcome **home**")
+        cache = BlockCache()
+        build(self.content, self.public, workers=2, cache=cache)
+        self.assertEqual(self.read("about.html"), self.read("index.html"))
+        self.assertEqual(cache.stats()["entries"], 3)
+        self.assertEqual(cache.hits + cache.misses, 5)
+
+    def test_build_skips_unchanged(self):
+        build(self.content, self.public, workers=1)
+        report = build(self.content, self.public, workers=1)
+        self.assertEqual(report.rebuilt, [])
+        self.assertEqual(len(report.skipped), 2)
+
+    def test_build_skips_touched(self):
+        build(self.content, self.public, workers=1)
+        source = os.path.join(self.content, "index.md")
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        report = build(self.content, self.public, workers=1)
+        self.assertEqual(report.rebuilt, [])
+
+    def test_build_rebuilds_changed(self):
+        build(self.content, self.public, workers=1)
+        self.write("index.md", "# Home\n\nWelcome _back_")
+        report = build(self.content, self.public, workers=1)
+        self.assertEqual(report.rebuilt, [os.path.join(self.public, "index.html")])
+        self.assertEqual(
+            self.read("index.html"),
+            "<div><h1>Home</h1><p>Welcome <i>back</i></p></div>",
+        )
+
+    def test_build_rebuilds_missing_output(self):
+        build(self.content, self.public, workers=1)
+        os.remove(os.path.join(self.public, "index.html"))
+        report = build(self.content, self.public, workers=1)
+        self.assertEqual(report.rebuilt, [os.path.join(self.public, "index.html")])
+
+    def test_build_removes_deleted(self):
+        build(self.content, self.public, workers=1)
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        report = build(self.content, self.public, workers=1)
+        dest = os.path.join(self.public, "blog", "post.html")
+        self.assertEqual(report.removed, [dest])
+        self.assertFalse(os.path.exists(dest))
+        self.assertFalse(os.path.exists(os.path.dirname(dest)))
+
+    def test_build_removes_deleted_precompressed(self):
+        build(self.content, self.public, workers=1)
+        dest = os.path.join(self.public, "blog", "post.html")
+        with open(dest + ".gz", "wb") as file:
+            file.write(b"")
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        build(self.content, self.public, workers=1)
+        self.assertFalse(os.path.exists(os.path.dirname(dest)))
+
+    def test_build_force(self):
+        build(self.content, self.public, workers=1)
+        report = build(self.content, self.public, workers=1, force=True)
+        self.assertEqual(len(report.rebuilt), 2)
+
+    def run_main(self, *argv):
+        site = ["--content", self.content, "--public", self.public, "--workers", "1"]
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            main([*argv, *site])
+        return output.getvalue()
+
+    def test_main_defaults_to_build(self):
+        self.assertIn("Rebuilt 2,", self.run_main())
+        self.assertIn("Rebuilt 0,", self.run_main("build"))
+        self.assertIn("Rebuilt 2,", self.run_main("--force"))
+        self.assertIn("Rebuilt 2,", self.run_main("build", "--force"))
+        # Build options go after the command, never silently reset by it.
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            with self.assertRaises(SystemExit):
+                self.run_main("--force", "build")
+        self.assertIn("unrecognized arguments: build", errors.getvalue())
+
+    def test_main_rejects_block_cache_with_parse_cache(self):
+        trees = os.path.join(self.tmp.name, "trees")
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            with self.assertRaises(SystemExit):
+                self.run_main("--block-cache", "10", "--parse-cache", trees)
+        self.assertIn("does not work with --parse-cache", errors.getvalue())
+
+    def test_main_rejects_profile_with_memory_budget(self):
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            with self.assertRaises(SystemExit):
+                self.run_main("--profile", "--memory-budget", "1M")
+        self.assertIn("--profile does not work with --memory-budget", errors.getvalue())
+
+    def test_main_single_arena_on_request(self):
+        with mock.patch("main.share_malloc_arena") as share:
+            self.run_main("--memory-budget", "1M")
+            share.assert_not_called()
+            self.run_main("--force", "--memory-budget", "1M", "--single-arena")
+            share.assert_called_once_with()
+
+    def test_build_template(self):
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w", encoding="utf-8") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+        build(self.content, self.public, workers=2, template=template)
+        self.assertEqual(
+            self.read("index.html"),
+            "<title>Home</title><div><h1>Home</h1><p>Welcome <b>home</b></p></div>",
+        )
+        self.assertEqual(
+            self.read(os.path.join("blog", "post.html")),
+            "<title>post</title><div><ul><li>one</li><li>two</li></ul></div>",
+        )
+        report = build(self.content, self.public, workers=1, template=template)
+        self.assertEqual(report.rebuilt, [])
+        with open(template, "w", encoding="utf-8") as file:
+            file.write("<h1>{{ Title }}</h1>{{ Content }}")
+        report = build(self.content, self.public, workers=1, template=template)
+        self.assertEqual(len(report.rebuilt), 2)
+        self.assertTrue(self.read("index.html").startswith("<h1>Home</h1><div>"))
+
+    def test_build_missing_template(self):
+        with self.assertRaisesRegex(ValueError, "template not found"):
+            build(self.content, self.public, template="missing.html")
+
+    def test_build_missing_content(self):
+        with self.assertRaises(ValueError):
+            build(os.path.join(self.tmp.name, "missing"), self.public)
+
+    def test_build_empty_page(self):
+        self.write("empty.md", " \n\n")
+        for options in ({}, {"cache": BlockCache()}, {"memory_budget": 1 << 20}):
+            with self.subTest(options=options):
+                build(self.content, self.public, workers=1, force=True, **options)
+                self.assertEqual(self.read("empty.html"), "<div></div>")
+
+    def test_build_reports_source(self):
+        self.write("bad.md", "unbalanced **bold")
+        with self.assertRaisesRegex(ValueError, "bad.md"):
+            build(self.content, self.public, workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import find_compressible, precompress
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write("index.html", "<p>home</p>" * 200)
+        self.write("styles.css", "body { color: red; }\n" * 100)
+        self.write(os.path.join("blog", "post.html"), "<p>tiny</p>")
+        self.write("image.png", "not text")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.public, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def path(self, relative):
+        return os.path.join(self.public, relative)
+
+    def test_find_compressible(self):
+        self.assertEqual(
+            find_compressible(self.public),
+            [
+                self.path("index.html"),
+                self.path("styles.css"),
+                self.path(os.path.join("blog", "post.html")),
+            ],
+        )
+
+    def test_precompress(self):
+        report = precompress(self.public, min_size=100, workers=2)
+        self.assertEqual(
+            sorted(report.rebuilt),
+            [self.path("index.html.gz"), self.path("styles.css.gz")],
+        )
+        with gzip.open(self.path("index.html.gz"), "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>home</p>" * 200)
+        self.assertFalse(os.path.exists(self.path("blog/post.html.gz")))
+        self.assertFalse(os.path.exists(self.path("image.png.gz")))
+
+    def test_skips_unchanged(self):
+        precompress(self.public, min_size=100)
+        report = precompress(self.public, min_size=100)
+        self.assertEqual(report.rebuilt, [])
+        self.assertEqual(len(report.skipped), 2)
+
+    def test_skips_rewritten_same_content(self):
+        precompress(self.public, min_size=100)
+        path = self.path("index.html")
+        stat = os.stat(path)
+        self.write("index.html", "<p>home</p>" * 200)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        report = precompress(self.public, min_size=100)
+        self.assertEqual(report.rebuilt, [])
+
+    def test_recompresses_changed(self):
+        precompress(self.public, min_size=100)
+        self.write("index.html", "<p>changed</p>" * 200)
+        report = precompress(self.public, min_size=100)
+        self.assertEqual(report.rebuilt, [self.path("index.html.gz")])
+        with gzip.open(self.path("index.html.gz"), "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>changed</p>" * 200)
+
+    def test_recompresses_new_level(self):
+        precompress(self.public, level=1, min_size=100)
+        report = precompress(self.public, level=9, min_size=100)
+        self.assertEqual(len(report.rebuilt), 2)
+
+    def test_removes_stale(self):
+        precompress(self.public, min_size=100)
+        os.remove(self.path("styles.css"))
+        self.write("index.html", "<p>short</p>")
+        report = precompress(self.public, min_size=100)
+        self.assertEqual(
+            sorted(report.removed),
+            [self.path("index.html.gz"), self.path("styles.css.gz")],
+        )
+        self.assertFalse(os.path.exists(self.path("styles.css.gz")))
+
+    def test_invalid_level(self):
+        with self.assertRaises(ValueError):
+            precompress(self.public, level=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from block_markdown import (
+    BlockType,
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+from corpus import generate_corpus, write_corpus
+
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(generate_corpus(5, seed=3), generate_corpus(5, seed=3))
+        self.assertNotEqual(generate_corpus(5, seed=3), generate_corpus(5, seed=4))
+
+    def test_pages_convert(self):
+        corpus = generate_corpus(20, link_density=3.0, nesting=3)
+        self.assertEqual(len(corpus), 20)
+        for _, markdown in corpus:
+            markdown_to_html_node(markdown).to_html()
+
+    def test_block_mix(self):
+        corpus = generate_corpus(3, blocks_per_page=10, block_mix={"code": 1})
+        for _, markdown in corpus:
+            blocks = markdown_to_blocks(markdown)
+            self.assertEqual(len(blocks), 10)
+            self.assertEqual(block_to_block_type(blocks[0]), BlockType.HEADING)
+            for block in blocks[1:]:
+                self.assertEqual(block_to_block_type(block), BlockType.CODE)
+
+    def test_link_density(self):
+        sparse = generate_corpus(5, link_density=0.0)
+        dense = generate_corpus(5, link_density=5.0)
+        self.assertEqual(sum(md.count("](/pages/") for _, md in sparse), 0)
+        self.assertGreater(sum(md.count("](/pages/") for _, md in dense), 100)
+
+    def test_write_corpus(self):
+        corpus = generate_corpus(5, nesting=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_corpus(tmp, corpus)
+            for path, markdown in corpus:
+                with open(os.path.join(tmp, path), encoding="utf-8") as file:
+                    self.assertEqual(file.read(), markdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
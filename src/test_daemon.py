@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import daemon as daemon_module
+from daemon import LatencyStats, RenderDaemon, render_document
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.daemon = RenderDaemon()
+
+    def request(self, request):
+        return json.loads(self.daemon.handle_line(json.dumps(request)))
+
+    def test_render_document(self):
+        self.assertEqual(
+            render_document("# Hi\n\n_there_"),
+            {"html": "<div><h1>Hi</h1><p><i>there</i></p></div>"},
+        )
+        self.assertEqual(
+            render_document("bad **bold"), {"error": "unbalanced delimiters"}
+        )
+
+    def test_batch(self):
+        response = self.request({"id": 7, "documents": ["one", "**two**"]})
+        self.assertEqual(response["id"], 7)
+        self.assertEqual(
+            response["results"],
+            [
+                {"html": "<div><p>one</p></div>"},
+                {"html": "<div><p><b>two</b></p></div>"},
+            ],
+        )
+        self.assertGreaterEqual(response["ms"], 0)
+
+    def test_invalid_requests(self):
+        response = json.loads(self.daemon.handle_line("{"))
+        self.assertTrue(response["error"].startswith("invalid request"))
+        response = json.loads(self.daemon.handle_line("[1, 2]"))
+        self.assertEqual(
+            response["error"], "invalid request: request must be a JSON object"
+        )
+        response = self.request({"id": 1, "documents": "not a list"})
+        self.assertEqual(response["error"], "documents must be a list of strings")
+
+    def test_bad_utf8_request(self):
+        response = json.loads(self.daemon.handle_line(b'{"documents": ["\xff"]}'))
+        self.assertTrue(response["error"].startswith("invalid request"))
+
+    def test_unexpected_errors_keep_serving(self):
+        with mock.patch.object(
+            daemon_module, "markdown_to_html", side_effect=RecursionError("deep")
+        ):
+            self.assertEqual(
+                render_document("text"),
+                {"error": "internal error: RecursionError('deep')"},
+            )
+        lines = ['{"id": 1, "documents": ["a"]}', '{"id": 2, "documents": ["b"]}']
+        output = io.StringIO()
+        with mock.patch.object(
+            RenderDaemon, "render", side_effect=[RuntimeError("boom"), ["ok"]]
+        ):
+            self.daemon.serve_stream(lines, output)
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(
+            responses[0], {"error": "internal error: RuntimeError('boom')"}
+        )
+        self.assertEqual(responses[1]["results"], ["ok"])
+
+    def test_stats(self):
+        for _ in range(3):
+            self.request({"documents": ["text"]})
+        response = self.request({"id": "s", "command": "stats"})
+        self.assertEqual(response["requests"], 3)
+        self.assertGreater(response["p99_ms"], 0)
+        self.assertGreaterEqual(response["p99_ms"], response["p50_ms"])
+
+    def test_latency_percentiles(self):
+        stats = LatencyStats(window=100)
+        self.assertEqual(stats.percentile(0.5), 0.0)
+        for millis in range(1, 101):
+            stats.record(millis / 1000)
+        self.assertAlmostEqual(stats.percentile(0.5), 51)
+        self.assertAlmostEqual(stats.percentile(0.99), 100)
+
+    def test_serve_stream(self):
+        lines = io.StringIO(
+            '{"id": 1, "documents": ["a"]}\n\n{"id": 2, "documents": []}\n'
+        )
+        output = io.StringIO()
+        self.daemon.serve_stream(lines, output)
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([response["id"] for response in responses], [1, 2])
+        self.assertEqual(responses[1]["results"], [])
+
+    def test_process_pool(self):
+        daemon = RenderDaemon(workers=2)
+        try:
+            results = daemon.render(["a", "_b_", "bad `code"])
+        finally:
+            daemon.close()
+        self.assertEqual(results[1], {"html": "<div><p><i>b</i></p></div>"})
+        self.assertEqual(results[2], {"error": "unbalanced delimiters"})
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+    def test_serve_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "render.sock")
+            thread = threading.Thread(
+                target=self.daemon.serve_socket, args=(path,), daemon=True
+            )
+            thread.start()
+            while not os.path.exists(path):
+                time.sleep(0.01)
+            with socket.socket(socket.AF_UNIX) as client:
+                client.connect(path)
+                client.sendall(b'{"id": 1, "documents": ["# Hi"]}\n')
+                response = json.loads(client.makefile("rb").readline())
+        self.assertEqual(response["results"], [{"html": "<div><h1>Hi</h1></div>"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+from build import build
+from depgraph import affected_pages, link_source, page_links, reverse_links
+
+
+class TestDepgraph(unittest.TestCase):
+    def test_link_source(self):
+        output = os.path.join("blog", "post.html")
+        self.assertEqual(link_source("/index.html", output), "index.md")
+        self.assertEqual(
+            link_source("other.html#top", output), os.path.join("blog", "other.md")
+        )
+        self.assertEqual(link_source("../about.md?x=1", output), "about.md")
+        self.assertIsNone(link_source("https://example.com/a.html", output))
+        self.assertIsNone(link_source("//example.com/a.html", output))
+        self.assertIsNone(link_source("/images/cat.png", output))
+        self.assertIsNone(link_source("../../outside.html", output))
+        self.assertIsNone(link_source("#top", output))
+
+    def test_page_links(self):
+        markdown = "[](/a.html) [text](/b.html) [](/a.html) ![](/c.html) [](/d.md)"
+        self.assertEqual(
+            page_links(markdown, "index.html"),
+            [["/a.html", "a.md"], ["/d.md", "d.md"]],
+        )
+
+    def test_reverse_links(self):
+        entries = {
+            "a.md": {"links": [["/b.html", "b.md"]]},
+            "c.md": {"links": [["/b.html", "b.md"], ["a.html", "a.md"]]},
+        }
+        self.assertEqual(
+            reverse_links(entries), {"b.md": ["a.md", "c.md"], "a.md": ["c.md"]}
+        )
+
+
+class TestDependencyBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w", encoding="utf-8") as file:
+            file.write("{{ Content }}")
+        self.write("index.md", "# Home\n\nRead [](blog/post.html)")
+        self.write(os.path.join("blog", "post.md"), "# Post\n\nBack [](/index.html)")
+        self.write("about.md", "# About\n\nNo links [here](/index.html)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, relative):
+        with open(os.path.join(self.public, relative), encoding="utf-8") as file:
+            return file.read()
+
+    def build(self):
+        report = build(self.content, self.public, workers=1, template=self.template)
+        prefix = len(os.path.join(self.public, ""))
+        return sorted(dest[prefix:] for dest in report.rebuilt)
+
+    def test_title_links(self):
+        self.build()
+        self.assertEqual(
+            self.read("index.html"),
+            '<div><h1>Home</h1><p>Read <a href="blog/post.html">Post</a></p></div>',
+        )
+
+    def test_body_edit_rebuilds_page_only(self):
+        self.build()
+        post = os.path.join("blog", "post.md")
+        self.write(post, "# Post\n\nBack home [](/index.html)")
+        self.assertEqual(self.build(), [os.path.join("blog", "post.html")])
+
+    def test_title_edit_rebuilds_dependents(self):
+        self.build()
+        self.write("index.md", "# Start\n\nRead [](blog/post.html)")
+        self.assertEqual(
+            self.build(), [os.path.join("blog", "post.html"), "index.html"]
+        )
+        self.assertIn(">Start</a>", self.read(os.path.join("blog", "post.html")))
+
+    def test_removed_page_rebuilds_dependents(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(self.build(), ["index.html"])
+        self.assertIn(">blog/post.html</a>", self.read("index.html"))
+
+    def test_affected_pages(self):
+        self.build()
+        self.assertEqual(
+            affected_pages(self.content, self.public, self.template),
+            ["about.md", os.path.join("blog", "post.md"), "index.md"],
+        )
+        self.assertEqual(
+            affected_pages(
+                self.content, self.public, os.path.join(self.content, "index.md")
+            ),
+            [os.path.join("blog", "post.md"), "index.md"],
+        )
+        self.assertEqual(
+            affected_pages(
+                self.content, self.public, os.path.join(self.content, "about.md")
+            ),
+            ["about.md"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,15 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import (
+    PROPS_CACHE,
+    HTMLNode,
+    LeafNode,
+    ParentNode,
+    SafeLeafNode,
+    escape_attribute,
+    escape_text,
+)
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -28,6 +37,35 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(props={})
         self.assertEqual(node.props_to_html(), "")
 
+    def test_props_escaped(self):
+        node = HTMLNode(props={"href": '/search?q="a"&b=<c>'})
+        self.assertEqual(
+            node.props_to_html(), ' href="/search?q=&quot;a&quot;&amp;b=&lt;c&gt;"'
+        )
+
+    def test_props_cached(self):
+        props = {"src": "/images/cat.png", "alt": "cat"}
+        html = HTMLNode(props=props).props_to_html()
+        self.assertIs(PROPS_CACHE[tuple(props.items())], html)
+        self.assertIs(HTMLNode(props=dict(props)).props_to_html(), html)
+
+    def test_unhashable_props(self):
+        node = HTMLNode(props={"data-pair": ("<a>", ["b"])})
+        self.assertEqual(node.props_to_html(), ' data-pair="(\'&lt;a&gt;\', [\'b\'])"')
+
+    def test_escape_text(self):
+        text = "plain text"
+        self.assertIs(escape_text(text), text)
+        self.assertEqual(
+            escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d'
+        )
+
+    def test_escape_attribute(self):
+        self.assertEqual(
+            escape_attribute('say "<hi>" & go'),
+            "say &quot;&lt;hi&gt;&quot; &amp; go",
+        )
+
     def test_init(self):
         test_tag = "p"
         test_val = "this is a pragraph"
@@ -37,6 +75,11 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node.tag, test_tag)
         self.assertEqual(node.value, test_val)
 
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(HTMLNode(), "__dict__"))
+        self.assertFalse(hasattr(LeafNode("b", "bold"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
     def test_emptyval_leafnode(self):
         node = LeafNode("p", None)
         with self.assertRaises(ValueError):
@@ -54,6 +97,19 @@ class TestHTMLNode(unittest.TestCase):
         node = LeafNode(test_tag, test_val, test_props)
         self.assertEqual(node.to_html(), '<a href="https://www.boot.dev">Boot.dev</a>')
 
+    def test_escaped_leafnode(self):
+        node = LeafNode("code", "if a < b && c > d:")
+        self.assertEqual(
+            node.to_html(), "<code>if a &lt; b &amp;&amp; c &gt; d:</code>"
+        )
+        self.assertEqual(LeafNode(None, "<br>").to_html(), "&lt;br&gt;")
+
+    def test_safe_leafnode(self):
+        node = SafeLeafNode("a", "link", {"href": "/page.html"})
+        self.assertEqual(node.to_html(), '<a href="/page.html">link</a>')
+        with self.assertRaises(ValueError):
+            SafeLeafNode("p", None).to_html()
+
     def test_emptyprops_leafnode(self):
         test_tag = "p"
         test_val = "this is a pragraph"
@@ -86,6 +142,41 @@ class TestHTMLNode(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "parent node must have children"):
             parent_node.to_html()
 
+    def test_to_html_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "text").to_html()
+
+    def test_iter_html_chunks(self):
+        parent_node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "plain "), LeafNode("b", "bold")]),
+                LeafNode("a", "link", {"href": "https://www.boot.dev"}),
+            ],
+        )
+        chunks = list(parent_node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), parent_node.to_html())
+
+    def test_string_children(self):
+        parent_node = ParentNode("p", ["a &amp; ", LeafNode("b", "bold"), " c"])
+        expected = "<p>a &amp; <b>bold</b> c</p>"
+        self.assertEqual(parent_node.to_html(), expected)
+        self.assertEqual("".join(parent_node.iter_html()), expected)
+
+    def test_write_html(self):
+        grandchild_node = LeafNode("b", "grandchild")
+        child_node = ParentNode("span", [grandchild_node])
+        parent_node = ParentNode("div", [child_node])
+        sink = io.StringIO()
+        parent_node.write_html(sink)
+        self.assertEqual(sink.getvalue(), "<div><span><b>grandchild</b></span></div>")
+
+    def test_iter_html_nochildren_parentnode(self):
+        parent_node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaisesRegex(ValueError, "parent node must have children"):
+            list(parent_node.iter_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,7 @@ import unittest
 from inline_markdown import (
     extract_markdown_images,
     extract_markdown_links,
+    merge_text_nodes,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
@@ -193,6 +194,17 @@ class TestInlineMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_links_after_image_with_same_text(self):
+        node = TextNode("![a](b) and [a](b)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(
+            [
+                TextNode("![a](b) and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+            ],
+            new_nodes,
+        )
+
     def test_text_to_textnode(self):
         text = "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
         new_nodes = text_to_textnodes(text)
@@ -212,6 +224,108 @@ class TestInlineMarkdown(unittest.TestCase):
         ]
         self.assertEqual(new_nodes, expected_nodes)
 
+    def test_text_to_textnode_unbalanced(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **bold text")
+        with self.assertRaises(ValueError):
+            text_to_textnodes("snake_case")
+
+    def test_text_to_textnode_delimiters_across_link(self):
+        for text in (
+            "a_b [l](u) c_d",
+            "`[l](u)`",
+            "**x ![i](s) y**",
+            "`![](_*`)",
+        ):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    text_to_textnodes(text)
+
+    def test_text_to_textnode_delimiters_across_earlier_pass(self):
+        for text in ("**a `b` c**", "**a _b_ c**", "_a `b` c_"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    text_to_textnodes(text)
+        self.assertEqual(
+            text_to_textnodes("_a **b** c_"),
+            [TextNode("a **b** c", TextType.ITALIC)],
+        )
+
+    def test_text_to_textnode_delimiters_beside_link(self):
+        expected_nodes = [
+            TextNode("a", TextType.ITALIC),
+            TextNode(" ", TextType.TEXT),
+            TextNode("l", TextType.LINK, "u"),
+            TextNode(" ", TextType.TEXT),
+            TextNode("b", TextType.ITALIC),
+        ]
+        self.assertEqual(text_to_textnodes("_a_ [l](u) _b_"), expected_nodes)
+
+    def test_text_to_textnode_delimiters_in_code(self):
+        text = "Run `make_all **now**` and _wait_"
+        expected_nodes = [
+            TextNode("Run ", TextType.TEXT),
+            TextNode("make_all **now**", TextType.CODE),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("wait", TextType.ITALIC),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_text_to_textnode_delimiters_in_link(self):
+        text = "See [my_page](https://example.com/my_page) for **more**"
+        expected_nodes = [
+            TextNode("See ", TextType.TEXT),
+            TextNode("my_page", TextType.LINK, "https://example.com/my_page"),
+            TextNode(" for ", TextType.TEXT),
+            TextNode("more", TextType.BOLD),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_text_to_textnode_multiline_bold(self):
+        text = "**first line\nsecond line**"
+        expected_nodes = [TextNode("first line\nsecond line", TextType.BOLD)]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_text_to_textnode_empty_delimiters(self):
+        text = "a `` b **** c"
+        expected_nodes = [TextNode("a  b  c", TextType.TEXT)]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_text_to_textnode_empty_delimiters_between_nodes(self):
+        text = "`x`__ y ** ** **z**"
+        expected_nodes = [
+            TextNode("x", TextType.CODE),
+            TextNode(" y ", TextType.TEXT),
+            TextNode(" ", TextType.BOLD),
+            TextNode(" ", TextType.TEXT),
+            TextNode("z", TextType.BOLD),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+        self.assertEqual(text_to_textnodes("__"), [])
+
+    def test_split_nodes_delimiter_merges_text(self):
+        nodes = [TextNode("a `` b", TextType.TEXT), TextNode(" c", TextType.TEXT)]
+        self.assertEqual(
+            split_nodes_delimiter(nodes, "`", TextType.CODE),
+            [TextNode("a  b c", TextType.TEXT)],
+        )
+
+    def test_merge_text_nodes(self):
+        nodes = [
+            TextNode("a", TextType.TEXT),
+            TextNode("b", TextType.TEXT),
+            TextNode("c", TextType.BOLD),
+            TextNode("d", TextType.TEXT),
+        ]
+        self.assertEqual(
+            merge_text_nodes(nodes),
+            [
+                TextNode("ab", TextType.TEXT),
+                TextNode("c", TextType.BOLD),
+                TextNode("d", TextType.TEXT),
+            ],
+        )
+
     def test_nothing_to_textnode(self):
         text = ""
         new_nodes = text_to_textnodes(text)
@@ -0,0 +1,91 @@
+import cProfile
+import os
+import pstats
+import tempfile
+import unittest
+
+import block_markdown
+import build
+from instrument import Profiler, collapsed_stacks
+from parse_store import ParseStore
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(self.content)
+        for name, text in (("a.md", "# A\n\nSome **text**"), ("b.md", "- x\n- y")):
+            path = os.path.join(self.content, name)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stage_counts(self):
+        with Profiler() as profiler:
+            build.build(self.content, self.public, workers=1)
+        summary = profiler.summary()
+        self.assertEqual(summary["page"]["calls"], 2)
+        self.assertEqual(summary["markdown_to_blocks"]["nodes"], 3)
+        self.assertEqual(summary["block_to_block_type"]["calls"], 3)
+        self.assertEqual(summary["text_to_textnodes"]["calls"], 4)
+        # Plain text is written inline, so only the bold node is converted.
+        self.assertEqual(summary["text_node_to_html_node"]["calls"], 1)
+        self.assertEqual(summary["to_html"]["calls"], 2)
+        self.assertEqual(
+            set(profiler.pages),
+            {os.path.join(self.content, "a.md"), os.path.join(self.content, "b.md")},
+        )
+        self.assertEqual(len(profiler.slowest_pages(1)), 1)
+
+    def test_stage_counts_parse_store(self):
+        store = ParseStore(os.path.join(self.tmp.name, "trees"))
+        with Profiler() as profiler:
+            build.build(self.content, self.public, workers=1, store=store)
+        summary = profiler.summary()
+        self.assertEqual(summary["page"]["calls"], 2)
+        self.assertEqual(summary["markdown_to_blocks"]["nodes"], 3)
+        # Each block is rendered from its tree.
+        self.assertEqual(summary["to_html"]["calls"], 3)
+        self.assertEqual(len(profiler.pages), 2)
+
+    def test_uninstall_restores_functions(self):
+        original = block_markdown.text_to_textnodes
+        profiler = Profiler()
+        profiler.install()
+        self.assertIsNot(block_markdown.text_to_textnodes, original)
+        profiler.uninstall()
+        self.assertIs(block_markdown.text_to_textnodes, original)
+
+    def test_write_reports(self):
+        profile = cProfile.Profile()
+        with Profiler() as profiler:
+            profile.enable()
+            build.build(self.content, self.public, workers=1)
+            profile.disable()
+        output = os.path.join(self.tmp.name, "profile")
+        profiler.write(output, pstats.Stats(profile), top=1)
+        self.assertEqual(
+            sorted(os.listdir(output)),
+            ["pages.json", "profile.folded", "slowest.json", "stages.json"],
+        )
+
+    def test_collapsed_stacks(self):
+        profile = cProfile.Profile()
+        profile.enable()
+        block_markdown.markdown_to_html_node("# Title\n\n" + "Some _text_\n\n" * 200)
+        profile.disable()
+        stacks = list(collapsed_stacks(pstats.Stats(profile)))
+        self.assertTrue(stacks)
+        for stack, micros in stacks:
+            self.assertGreater(micros, 0)
+        self.assertTrue(
+            any("markdown_to_html_node" in stack and ";" in stack for stack, _ in stacks)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from manifest import file_hash, load_manifest, manifest_path, save_manifest
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "public.manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_manifest_path(self):
+        self.assertEqual(manifest_path("public/"), "public.manifest.json")
+
+    def test_roundtrip(self):
+        pages = {"index.md": {"hash": "abc", "output": "index.html"}}
+        save_manifest(self.path, pages)
+        self.assertEqual(load_manifest(self.path), pages)
+
+    def test_missing_manifest(self):
+        self.assertEqual(load_manifest(self.path), {})
+
+    def test_corrupt_manifest(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("{not json")
+        self.assertEqual(load_manifest(self.path), {})
+
+    def test_file_hash(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("text")
+        self.assertEqual(
+            file_hash(self.path),
+            "982d9e3eb996f559e633f4d194def3761d909f5a3b647d1a851fead67c32c9d1",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from build import build, shard_pages
+from corpus import generate_corpus, write_corpus
+from manifest import load_manifest, manifest_path, read_manifest
+from merge import merge_shards
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+class TestShardPages(unittest.TestCase):
+    def test_balanced_by_size(self):
+        pages = [(f"page-{idx}.md", 1000 if idx < 4 else 10) for idx in range(400)]
+        owners = shard_pages(pages, 4)
+        loads = [0] * 4
+        for (_, size), owner in zip(pages, owners):
+            loads[owner] += size
+        # Within the slack of an even share, despite the four big pages.
+        for load in loads:
+            self.assertLessEqual(load, 1.1 * sum(loads) / 4)
+
+    def test_order_independent(self):
+        pages = [(f"page-{idx}.md", idx % 7) for idx in range(50)]
+        owners = dict(zip((key for key, _ in pages), shard_pages(pages, 4)))
+        reordered = pages[::-1]
+        self.assertEqual(
+            dict(zip((key for key, _ in reordered), shard_pages(reordered, 4))),
+            owners,
+        )
+        self.assertEqual(set(owners.values()), {0, 1, 2, 3})
+
+    def test_stable_when_a_page_changes(self):
+        pages = [(f"page-{idx}.md", 100 + idx % 13) for idx in range(100)]
+        owners = shard_pages(pages, 3)
+        edited = list(pages)
+        edited[40] = ("page-40.md", 150)
+        moved = [
+            key
+            for (key, _), old, new in zip(pages, owners, shard_pages(edited, 3))
+            if key != "page-40.md" and old != new
+        ]
+        self.assertEqual(moved, [])
+
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w", encoding="utf-8") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+        write_corpus(self.content, generate_corpus(pages=30, blocks_per_page=4))
+        with open(os.path.join(self.content, "index.md"), "w") as file:
+            file.write("# Home\n\nSee [](page-0.html) and [](page-1.html)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def staging(self, index):
+        return os.path.join(self.tmp.name, f"staging-{index}")
+
+    def run_shards(self, count):
+        """
+        Runs every shard build as its own process.
+        """
+        processes = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    MAIN,
+                    "build",
+                    "--content",
+                    self.content,
+                    "--public",
+                    self.staging(index),
+                    "--template",
+                    self.template,
+                    "--workers",
+                    "1",
+                    "--shard",
+                    f"{index}/{count}",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+            for index in range(1, count + 1)
+        ]
+        for process in processes:
+            _, stderr = process.communicate()
+            self.assertEqual(process.returncode, 0, stderr.decode())
+        return [self.staging(index) for index in range(1, count + 1)]
+
+    def outputs(self, directory):
+        files = {}
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, encoding="utf-8") as file:
+                    files[os.path.relpath(path, directory)] = file.read()
+        return files
+
+    def test_merge_matches_single_build(self):
+        staging_dirs = self.run_shards(3)
+        for staging_dir in staging_dirs:
+            self.assertLess(len(load_manifest(manifest_path(staging_dir))), 31)
+        report = merge_shards(staging_dirs, self.public)
+        self.assertEqual(len(report.rebuilt), 31)
+        single = os.path.join(self.tmp.name, "single")
+        build(self.content, single, workers=1, template=self.template)
+        self.assertEqual(self.outputs(self.public), self.outputs(single))
+        self.assertEqual(
+            load_manifest(manifest_path(self.public)),
+            load_manifest(manifest_path(single)),
+        )
+        self.assertNotIn("shard", read_manifest(manifest_path(self.public)))
+        # A build over the merged output finds nothing left to render.
+        report = build(self.content, self.public, workers=1, template=self.template)
+        self.assertEqual((len(report.rebuilt), len(report.skipped)), (0, 31))
+
+    def test_edit_keeps_owners(self):
+        staging_dirs = self.run_shards(3)
+        owned = [set(load_manifest(manifest_path(d))) for d in staging_dirs]
+        with open(os.path.join(self.content, "page-3.md"), "a") as file:
+            file.write("\n\nMore text.")
+        reports = [
+            build(
+                self.content,
+                staging_dir,
+                workers=1,
+                template=self.template,
+                shard=(index, 3),
+            )
+            for index, staging_dir in enumerate(staging_dirs, 1)
+        ]
+        self.assertEqual(
+            [set(load_manifest(manifest_path(d))) for d in staging_dirs], owned
+        )
+        self.assertEqual(sum(len(report.removed) for report in reports), 0)
+        self.assertEqual(
+            [os.path.basename(path) for report in reports for path in report.rebuilt],
+            ["page-3.html"],
+        )
+
+    def test_incremental_shards(self):
+        staging_dirs = self.run_shards(2)
+        merge_shards(staging_dirs, self.public)
+        with open(os.path.join(self.content, "page-0.md"), "w") as file:
+            file.write("# Renamed\n\nNew text")
+        reports = [
+            build(
+                self.content,
+                staging_dir,
+                workers=1,
+                template=self.template,
+                shard=(index, 2),
+            )
+            for index, staging_dir in enumerate(staging_dirs, 1)
+        ]
+        rebuilt = sorted(
+            os.path.basename(path) for report in reports for path in report.rebuilt
+        )
+        self.assertEqual(rebuilt, ["index.html", "page-0.html"])
+        report = merge_shards(staging_dirs, self.public)
+        self.assertEqual(
+            sorted(os.path.basename(path) for path in report.rebuilt),
+            ["index.html", "page-0.html"],
+        )
+        with open(os.path.join(self.public, "index.html"), encoding="utf-8") as file:
+            self.assertIn(">Renamed</a>", file.read())
+
+    def test_removed_page(self):
+        staging_dirs = self.run_shards(2)
+        merge_shards(staging_dirs, self.public)
+        os.remove(os.path.join(self.content, "index.md"))
+        for index, staging_dir in enumerate(staging_dirs, 1):
+            build(self.content, staging_dir, workers=1, shard=(index, 2))
+        report = merge_shards(staging_dirs, self.public)
+        self.assertEqual(report.removed, [os.path.join(self.public, "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_conflicts(self):
+        staging_dirs = self.run_shards(2)
+        with self.assertRaisesRegex(ValueError, "missing shards: 2"):
+            merge_shards(staging_dirs[:1], self.public)
+        with self.assertRaisesRegex(ValueError, "shard 1 given twice"):
+            merge_shards([staging_dirs[0], staging_dirs[0]], self.public)
+        with self.assertRaisesRegex(ValueError, "no shard manifest"):
+            merge_shards([self.content], self.public)
+
+        path = manifest_path(staging_dirs[1])
+        with open(path, encoding="utf-8") as file:
+            original = file.read()
+        manifest = json.loads(original)
+        stolen = next(iter(manifest["shard"]["others"]))
+        manifest["pages"][stolen] = manifest["shard"]["others"][stolen]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        with self.assertRaisesRegex(ValueError, "page built by shards 1 and 2"):
+            merge_shards(staging_dirs, self.public)
+
+        manifest = json.loads(original)
+        key = next(iter(manifest["shard"]["others"]))
+        manifest["shard"]["others"][key]["hash"] = "0" * 64
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        with self.assertRaisesRegex(ValueError, "shard 2 saw a different content"):
+            merge_shards(staging_dirs, self.public)
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(original)
+        output = next(iter(json.loads(original)["pages"].values()))["output"]
+        os.remove(os.path.join(staging_dirs[1], output))
+        with self.assertRaisesRegex(ValueError, "shard 2 lacks its output"):
+            merge_shards(staging_dirs, self.public)
+
+    def test_invalid_shard(self):
+        with self.assertRaisesRegex(ValueError, "invalid shard: 3/2"):
+            build(self.content, self.public, shard=(3, 2))
+        process = subprocess.run(
+            [sys.executable, MAIN, "build", "--shard", "0/2"],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(process.returncode, 2)
+        self.assertIn("expected 1 <= I <= N", process.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
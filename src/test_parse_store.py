@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+
+import parse_store
+from block_markdown import markdown_to_html, markdown_to_tree, tree_to_html
+from build import build
+from corpus import generate_corpus
+from parse_store import ParseStore
+
+
+class TestParseTree(unittest.TestCase):
+    def test_tree_to_html_matches(self):
+        documents = [markdown for _, markdown in generate_corpus(pages=5)]
+        documents.append(
+            "# T & <b>\n\n1. [](/a?b=1&c=\"2\")\n2. ![x\"y](/cat.png)\n\n"
+            "```\na < b\n```"
+        )
+        for markdown in documents:
+            self.assertEqual(
+                tree_to_html(markdown_to_tree(markdown)), markdown_to_html(markdown)
+            )
+
+    def test_tree_layout(self):
+        tree = markdown_to_tree("## A **b**\n\n- x\n- y & z\n\n```\ncode\n```")
+        self.assertEqual(
+            tree,
+            (
+                ("h2", (False, 0, "A ", None, 1, "b", None)),
+                ("ul", ((False, 0, "x", None), (True, 0, "y & z", None))),
+                ("pre", "code\n"),
+            ),
+        )
+
+    def test_empty_tree(self):
+        self.assertEqual(markdown_to_tree(""), ())
+        self.assertEqual(tree_to_html(markdown_to_tree("")), "<div></div>")
+        self.assertEqual(tree_to_html(markdown_to_tree("``")), "<div><p></p></div>")
+
+
+class TestParseStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "trees")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_and_miss(self):
+        store = ParseStore(self.directory)
+        html = store.markdown_to_html("# Title\n\nSome **text**")
+        self.assertEqual(html, markdown_to_html("# Title\n\nSome **text**"))
+        self.assertEqual((store.hits, store.misses), (0, 1))
+        other = ParseStore(self.directory)
+        self.assertEqual(other.markdown_to_html("# Title\n\nSome **text**"), html)
+        self.assertEqual((other.hits, other.misses), (1, 0))
+
+    def test_version_mismatch(self):
+        store = ParseStore(self.directory)
+        store.save("abcd", (("p", (False, 0, "old", None)),))
+        self.assertIsNotNone(store.load("abcd"))
+        store.version = "other"
+        self.assertIsNone(store.load("abcd"))
+
+    def test_parser_version_tracks_store_version(self):
+        version = parse_store.parser_version()
+        original = parse_store.PARSE_STORE_VERSION
+        parse_store.PARSE_STORE_VERSION = original + 1
+        try:
+            self.assertNotEqual(parse_store.parser_version(), version)
+        finally:
+            parse_store.PARSE_STORE_VERSION = original
+
+    def test_corrupt_entry(self):
+        store = ParseStore(self.directory)
+        path = store.path("abcd")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as file:
+            file.write(b"not a tree")
+        self.assertIsNone(store.load("abcd"))
+
+    def test_prune(self):
+        store = ParseStore(self.directory)
+        store.save("aa11", ())
+        store.save("bb22", ())
+        self.assertEqual(store.prune({"aa11"}), 1)
+        self.assertIsNotNone(store.load("aa11"))
+        self.assertIsNone(store.load("bb22"))
+        self.assertEqual(ParseStore(self.tmp.name + "/missing").prune(set()), 0)
+
+
+class TestParseStoreBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.directory = os.path.join(self.tmp.name, "trees")
+        self.write_template("<main>{{ Content }}</main>")
+        os.makedirs(self.content)
+        for name, text in (("a.md", "# A\n\nSome **text**"), ("b.md", "- x\r\n- y")):
+            with open(os.path.join(self.content, name), "wb") as file:
+                file.write(text.encode("utf-8"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_template(self, text):
+        with open(self.template, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def build(self, store):
+        return build(
+            self.content, self.public, workers=1, template=self.template, store=store
+        )
+
+    def read(self, name):
+        with open(os.path.join(self.public, name), encoding="utf-8") as file:
+            return file.read()
+
+    def test_layout_change_skips_parsing(self):
+        store = ParseStore(self.directory)
+        self.build(store)
+        self.assertEqual((store.hits, store.misses), (0, 2))
+        self.write_template("<body>{{ Content }}</body>")
+        store = ParseStore(self.directory)
+        report = self.build(store)
+        self.assertEqual(len(report.rebuilt), 2)
+        self.assertEqual((store.hits, store.misses), (2, 0))
+        self.assertEqual(
+            self.read("b.html"), "<body><div><ul><li>x</li><li>y</li></ul></div></body>"
+        )
+
+    def test_removed_page_pruned(self):
+        store = ParseStore(self.directory)
+        self.build(store)
+        os.remove(os.path.join(self.content, "a.md"))
+        self.build(store)
+        entries = [
+            name
+            for prefix in os.listdir(self.directory)
+            for name in os.listdir(os.path.join(self.directory, prefix))
+        ]
+        self.assertEqual(len(entries), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from build import build
+from corpus import generate_corpus, write_corpus
+from parse_store import ParseStore
+from pipeline import ByteQueue, MemoryBudget, run_pipeline
+
+
+class TestByteQueue(unittest.TestCase):
+    def test_put_blocks_when_full(self):
+        queue = ByteQueue(10)
+        queue.put("a", 6)
+        done = threading.Event()
+
+        def produce():
+            queue.put("b", 6)
+            done.set()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        self.assertFalse(done.wait(0.05))
+        self.assertEqual(queue.get(), "a")
+        thread.join()
+        self.assertTrue(done.is_set())
+        self.assertEqual(queue.stats()["peak_bytes"], 6)
+        self.assertGreater(queue.stats()["blocked_seconds"], 0)
+
+    def test_oversized_item_passes_empty_queue(self):
+        queue = ByteQueue(10)
+        self.assertTrue(queue.put("big", 100))
+        self.assertEqual(queue.get(), "big")
+
+    def test_close(self):
+        queue = ByteQueue(10)
+        queue.put("a", 1)
+        queue.close()
+        self.assertFalse(queue.put("b", 1))
+        self.assertEqual(queue.get(), "a")
+        self.assertIsNone(queue.get())
+        queue = ByteQueue(10)
+        queue.put("a", 1)
+        queue.close(drop=True)
+        self.assertIsNone(queue.get())
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_acquire_blocks_until_released(self):
+        budget = MemoryBudget(10)
+        self.assertTrue(budget.acquire(6))
+        done = threading.Event()
+
+        def take():
+            budget.acquire(6)
+            done.set()
+
+        thread = threading.Thread(target=take)
+        thread.start()
+        self.assertFalse(done.wait(0.05))
+        budget.release(6)
+        thread.join()
+        self.assertEqual(budget.stats()["peak_bytes"], 6)
+        self.assertGreater(budget.stats()["blocked_seconds"], 0)
+
+    def test_oversized_item_waits_for_empty(self):
+        budget = MemoryBudget(10)
+        budget.acquire(1)
+        thread = threading.Thread(target=budget.acquire, args=(100,))
+        thread.start()
+        thread.join(0.05)
+        self.assertTrue(thread.is_alive())
+        budget.release(1)
+        thread.join()
+        self.assertEqual(budget.stats()["peak_bytes"], 100)
+        self.assertEqual(budget.stats()["peak_items"], 1)
+
+    def test_close(self):
+        budget = MemoryBudget(10)
+        budget.acquire(10)
+        budget.close()
+        self.assertFalse(budget.acquire(1))
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_stages_in_order(self):
+        results = []
+        stats = run_pipeline(
+            range(100),
+            (
+                ("double", lambda item: (item * 2, 8)),
+                ("slow", lambda item: (time.sleep(0.0005) or item + 1, 8)),
+                ("collect", results.append),
+            ),
+            memory_budget=64,
+            weigh=lambda item: 16,
+        )
+        self.assertEqual(results, [item * 2 + 1 for item in range(100)])
+        self.assertEqual(list(stats), ["in flight", "double", "slow"])
+        # Four items of 16 bytes fill the budget, wherever they are.
+        self.assertEqual(stats["in flight"]["peak_bytes"], 64)
+        self.assertEqual(stats["in flight"]["peak_items"], 4)
+        self.assertGreater(stats["in flight"]["blocked_seconds"], 0)
+        for name in ("double", "slow"):
+            self.assertLessEqual(stats[name]["peak_items"], 4)
+
+    def test_error_stops_pipeline(self):
+        def fail(item):
+            if item == 5:
+                raise ValueError("bad item")
+            return item, 1
+
+        results = []
+        with self.assertRaisesRegex(ValueError, "bad item"):
+            run_pipeline(
+                range(10_000),
+                (
+                    ("source", lambda item: (item, 1)),
+                    ("fail", fail),
+                    ("sink", results.append),
+                ),
+                memory_budget=4,
+                weigh=lambda item: 1,
+            )
+        self.assertLess(len(results), 10)
+
+
+class TestBoundedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w", encoding="utf-8") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+        write_corpus(self.content, generate_corpus(pages=20, blocks_per_page=5))
+        with open(os.path.join(self.content, "index.md"), "w") as file:
+            file.write("# Home & more\n\nSee [](page-0.html) and [](page-1.html)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def outputs(self, directory):
+        files = {}
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, encoding="utf-8") as file:
+                    files[os.path.relpath(path, directory)] = file.read()
+        return files
+
+    def build(self, name, **kwargs):
+        public = os.path.join(self.tmp.name, name)
+        report = build(self.content, public, template=self.template, **kwargs)
+        return public, report
+
+    def test_matches_unbounded_build(self):
+        expected, expected_report = self.build("expected", workers=1)
+        expected_rebuilt = [
+            os.path.relpath(path, expected) for path in expected_report.rebuilt
+        ]
+        for workers in (1, 2):
+            public, report = self.build(
+                f"bounded-{workers}", workers=workers, memory_budget=30_000
+            )
+            self.assertEqual(self.outputs(public), self.outputs(expected))
+            self.assertEqual(
+                [os.path.relpath(path, public) for path in report.rebuilt],
+                expected_rebuilt,
+            )
+            self.assertEqual(
+                list(report.stages), ["in flight", "read", "parse", "render"]
+            )
+            for marks in report.stages.values():
+                self.assertGreater(marks["peak_items"], 0)
+
+    def test_budget_bounds_pages_in_flight(self):
+        budget = 30_000
+        _, report = self.build("bounded", workers=1, memory_budget=budget)
+        marks = report.stages["in flight"]
+        self.assertGreater(marks["peak_items"], 1)
+        self.assertLessEqual(marks["peak_bytes"], budget)
+        # A page over the whole budget goes through alone.
+        _, report = self.build("alone", workers=1, memory_budget=1000)
+        self.assertEqual(report.stages["in flight"]["peak_items"], 1)
+
+    def test_parse_store(self):
+        store = ParseStore(os.path.join(self.tmp.name, "trees"))
+        self.build("first", workers=1, memory_budget=1 << 20, store=store)
+        self.assertEqual((store.hits, store.misses), (0, 21))
+        public, _ = self.build("second", workers=1, memory_budget=1 << 20, store=store)
+        self.assertEqual(store.hits, 21)
+        expected, _ = self.build("expected", workers=1)
+        self.assertEqual(self.outputs(public), self.outputs(expected))
+
+    def test_error_names_source(self):
+        with open(os.path.join(self.content, "broken.md"), "w") as file:
+            file.write("Some `code")
+        with self.assertRaisesRegex(ValueError, "broken.md: unbalanced"):
+            self.build("broken", workers=1, memory_budget=1 << 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from search_index import (
+    build_search_index,
+    index_shards,
+    page_terms,
+    read_shard,
+    read_varint,
+    search,
+    write_varint,
+)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write("index.md", "# Home\n\nWelcome to the **static** site")
+        self.write(
+            os.path.join("blog", "post.md"),
+            "# Markdown tips\n\n- Use _static_ sites\n- Static is fast\n\n"
+            "```\nhidden code words\n```\n\n[a link](/index.html)",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_varint_roundtrip(self):
+        out = bytearray()
+        for value in (0, 1, 127, 128, 300, 2**32):
+            write_varint(out, value)
+        pos = 0
+        values = []
+        while pos < len(out):
+            value, pos = read_varint(out, pos)
+            values.append(value)
+        self.assertEqual(values, [0, 1, 127, 128, 300, 2**32])
+        self.assertEqual(len(out), 1 + 1 + 1 + 2 + 2 + 5)
+
+    def test_page_terms(self):
+        title, terms = page_terms(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(title, "Markdown tips")
+        self.assertEqual(terms["static"], 2)
+        self.assertEqual(terms["link"], 1)
+        self.assertNotIn("hidden", terms)
+        self.assertNotIn("a", terms)
+
+    def test_build_and_search(self):
+        for workers in (1, 2):
+            index_dir = os.path.join(self.tmp.name, f"search-{workers}")
+            stats = build_search_index(
+                self.content, self.public, index_dir, shards=4, workers=workers
+            )
+            self.assertEqual(stats["pages"], 2)
+            self.assertEqual(
+                search(index_dir, "Static"),
+                [["/blog/post.html", "Markdown tips"], ["/index.html", "Home"]],
+            )
+            self.assertEqual(
+                search(index_dir, "static welcome"), [["/index.html", "Home"]]
+            )
+            self.assertEqual(search(index_dir, "hidden"), [])
+
+    def test_shards_hold_every_posting(self):
+        index_dir = os.path.join(self.public, "search")
+        stats = build_search_index(self.content, self.public, shards=3)
+        postings = {}
+        for shard in range(3):
+            shard_path = os.path.join(index_dir, f"shard-{shard:03}.bin")
+            postings.update(read_shard(shard_path))
+        self.assertEqual(len(postings), stats["terms"])
+        self.assertEqual(sum(map(len, postings.values())), stats["postings"])
+        self.assertEqual(postings["static"], [(0, 1), (1, 2)])
+
+    def test_rebuild_replaces_index(self):
+        index_dir = os.path.join(self.public, "search")
+        build_search_index(self.content, self.public, shards=8)
+        build_search_index(self.content, self.public, shards=2)
+        shard_files = [name for name in os.listdir(index_dir) if name.endswith(".bin")]
+        self.assertEqual(sorted(shard_files), ["shard-000.bin", "shard-001.bin"])
+        self.assertEqual(index_shards(index_dir), 2)
+        self.assertIsNone(index_shards(self.content))
+
+    def test_invalid_shards(self):
+        with self.assertRaises(ValueError):
+            build_search_index(self.content, self.public, shards=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
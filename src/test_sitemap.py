@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from build import build
+from sitemap import SITEMAP_NAMESPACE, write_site_files
+
+SITE_URL = "https://example.com/"
+
+
+class TestSitemap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        for idx in range(5):
+            self.write(f"page-{idx}.md", f"# Page & {idx}\n\ntext", idx)
+        self.write(os.path.join("blog", "my post.md"), "no title", 10)
+        build(self.content, self.public, workers=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text, age=0):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        mtime_ns = (1_700_000_000 + age * 60) * 10**9
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def parse(self, name):
+        return ElementTree.parse(os.path.join(self.public, name)).getroot()
+
+    def locs(self, name):
+        return [
+            loc.text for loc in self.parse(name).iter(f"{{{SITEMAP_NAMESPACE}}}loc")
+        ]
+
+    def test_sitemap(self):
+        report = write_site_files(self.public, SITE_URL)
+        self.assertEqual(len(report.rebuilt), 3)
+        self.assertEqual(
+            self.locs("sitemap.xml"),
+            [f"https://example.com/page-{idx}.html" for idx in range(5)]
+            + ["https://example.com/blog/my%20post.html"],
+        )
+
+    def test_sitemap_index(self):
+        write_site_files(self.public, SITE_URL, limit=4)
+        self.assertEqual(
+            self.locs("sitemap.xml"),
+            ["https://example.com/sitemap-1.xml", "https://example.com/sitemap-2.xml"],
+        )
+        self.assertEqual(len(self.locs("sitemap-1.xml")), 4)
+        self.assertEqual(len(self.locs("sitemap-2.xml")), 2)
+        write_site_files(self.public, SITE_URL)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "sitemap-1.xml")))
+
+    def test_feeds(self):
+        # Titles come from the build manifest, without reading the sources.
+        shutil.rmtree(self.content)
+        write_site_files(self.public, SITE_URL, "My site", feed_size=3)
+        atom = self.parse("atom.xml")
+        namespace = "{http://www.w3.org/2005/Atom}"
+        titles = [title.text for title in atom.iter(f"{namespace}title")]
+        self.assertEqual(titles, ["My site", "my post", "Page & 4", "Page & 3"])
+        rss = self.parse("rss.xml")
+        links = [link.text for link in rss.iter("link")]
+        self.assertEqual(links[1], "https://example.com/blog/my%20post.html")
+        self.assertEqual(len(rss.findall("channel/item")), 3)
+
+    def test_incremental(self):
+        write_site_files(self.public, SITE_URL, limit=4, feed_size=2)
+        report = write_site_files(self.public, SITE_URL, limit=4, feed_size=2)
+        self.assertEqual(report.rebuilt, [])
+        self.write("page-0.md", "# Changed\n\ntext")
+        build(self.content, self.public, workers=1)
+        report = write_site_files(self.public, SITE_URL, limit=4, feed_size=2)
+        self.assertEqual(report.rebuilt, [os.path.join(self.public, "sitemap-1.xml")])
+        self.write("page-0.md", "# Changed again\n\ntext", 20)
+        build(self.content, self.public, workers=1)
+        report = write_site_files(self.public, SITE_URL, limit=4, feed_size=2)
+        self.assertEqual(
+            sorted(os.path.basename(path) for path in report.rebuilt),
+            ["atom.xml", "rss.xml", "sitemap-1.xml", "sitemap.xml"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import TEMPLATE_CACHE, Template, extract_title, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_parse(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertEqual(
+            template.parts,
+            ["<title>", None, "</title><body>", None, "</body>"],
+        )
+        self.assertEqual(template.slots, [(1, "Title"), (3, "Content")])
+        self.assertEqual(template.names, {"Title", "Content"})
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}<p>{{ Title }}</p>")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<h1>Home</h1><p>hi</p><p>Home</p>",
+        )
+
+    def test_render_without_placeholders(self):
+        self.assertEqual(Template("<p>static</p>").render({}), "<p>static</p>")
+
+    def test_write_html_node(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        node = ParentNode("div", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        sink = io.StringIO()
+        template.write(sink, {"Title": "Home", "Content": node})
+        self.assertEqual(
+            sink.getvalue(), "<title>Home</title><div><b>bold</b> text</div>"
+        )
+
+    def test_missing_value(self):
+        with self.assertRaisesRegex(ValueError, "missing template value: Content"):
+            Template("{{ Content }}").render({"Title": "Home"})
+
+    def test_load_template_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("<p>{{ Content }}</p>")
+            template = load_template(path)
+            self.assertIs(load_template(path), template)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("<div>{{ Content }}</div>")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            reloaded = load_template(path)
+            self.assertIsNot(reloaded, template)
+            self.assertEqual(reloaded.render({"Content": "x"}), "<div>x</div>")
+            TEMPLATE_CACHE.pop(path)
+
+    def test_extract_title(self):
+        self.assertEqual(extract_title("Intro\n\n#  Hello  \n\n# Second"), "Hello")
+        self.assertEqual(extract_title("## Sub\n\ntext", "page"), "page")
+
+    def test_extract_title_blocks(self):
+        code = "```\n# not a title\n```\n\n# Real"
+        self.assertEqual(extract_title(code), "Real")
+        self.assertEqual(extract_title("text\n# inside a paragraph", "page"), "page")
+        self.assertEqual(
+            extract_title("# **Bold** and [link](/a) `code`"), "Bold and link code"
+        )
+        self.assertEqual(extract_title("# ``", "page"), "page")
+        self.assertEqual(extract_title("# a **b"), "a **b")
+
+
+if __name__ == "__main__":
+    unittest.main()
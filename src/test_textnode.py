@@ -1,6 +1,7 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from htmlnode import SafeLeafNode
+from textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html
 
 
 class TestTextNode(unittest.TestCase):
@@ -29,6 +30,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a link", TextType.LINK, url=None)
         self.assertEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
@@ -57,6 +62,43 @@ class TestTextNode(unittest.TestCase):
             html_node.props, {"src": "https://www.boot.dev", "alt": "This is an image"}
         )
 
+    def test_leaf_node_class(self):
+        node = TextNode("This is a bold text node", TextType.BOLD)
+        html_node = text_node_to_html_node(node, SafeLeafNode)
+        self.assertIsInstance(html_node, SafeLeafNode)
+        self.assertEqual(html_node.to_html(), "<b>This is a bold text node</b>")
+
+    def test_wrong_text_type(self):
+        node = TextNode("text", "bold")
+        with self.assertRaisesRegex(ValueError, "wrong text type"):
+            text_node_to_html_node(node)
+        with self.assertRaisesRegex(ValueError, "wrong text type"):
+            text_nodes_to_html([node])
+
+    def test_text_nodes_to_html(self):
+        nodes = [
+            TextNode("a < b ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("it", TextType.ITALIC),
+            TextNode("x & y", TextType.CODE),
+            TextNode("link", TextType.LINK, '/a?b=1&c="2"'),
+            TextNode('alt "text"', TextType.IMAGE, "/cat.png"),
+            TextNode("no url", TextType.LINK),
+        ]
+        expected = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        self.assertEqual(text_nodes_to_html(nodes), expected)
+        self.assertEqual(text_nodes_to_html([]), "")
+
+    def test_text_nodes_to_html_unescaped(self):
+        nodes = [
+            TextNode("plain ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "/a?b=1&c=2"),
+        ]
+        self.assertEqual(
+            text_nodes_to_html(nodes, escape=False),
+            'plain <a href="/a?b=1&amp;c=2">link</a>',
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from build import build
+from watch import (
+    LIVERELOAD_SCRIPT,
+    InotifyWatcher,
+    LiveReload,
+    PollingWatcher,
+    TitleGraph,
+    rerender,
+    serve,
+)
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write("index.md", "# Home")
+        self.write(os.path.join("blog", "post.md"), "Some _post_")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+
+    def check_watcher(self, watcher):
+        source = self.write("index.md", "# Home again")
+        changed, removed = watcher.poll(0.5)
+        self.assertEqual(changed, [(source, os.path.join(self.public, "index.html"))])
+        self.assertEqual(removed, [])
+
+        removed_source = os.path.join(self.content, "blog", "post.md")
+        os.remove(removed_source)
+        changed, removed = watcher.poll(0.5)
+        self.assertEqual(changed, [])
+        self.assertEqual(
+            removed,
+            [(removed_source, os.path.join(self.public, "blog", "post.html"))],
+        )
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher(self.content, self.public)
+        # Make sure the rewrite below gets a different size and mtime.
+        self.write("index.md", "# Home, first edit")
+        watcher.poll(0)
+        self.check_watcher(watcher)
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher(self.content, self.public)
+        except (OSError, AttributeError, TypeError):
+            self.skipTest("inotify is not available")
+        try:
+            self.check_watcher(watcher)
+            self.assertEqual(watcher.poll(0), ([], []))
+        finally:
+            watcher.close()
+
+    def test_rerender(self):
+        source = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.public, "index.html")
+        bad = self.write("bad.md", "**unbalanced")
+        errors = rerender(
+            [(source, dest), (bad, os.path.join(self.public, "bad.html"))],
+            [],
+            self.content,
+            self.public,
+        )
+        with open(dest, encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<div><h1>Home</h1></div>")
+        self.assertEqual(len(errors), 1)
+        rerender([], [(source, dest)], self.content, self.public)
+        self.assertFalse(os.path.exists(dest))
+
+    def test_rerender_link_titles(self):
+        source = self.write("links.md", "See [](/index.html) and [](missing.html)")
+        dest = os.path.join(self.public, "links.html")
+        rerender([(source, dest)], [], self.content, self.public)
+        with open(dest, encoding="utf-8") as file:
+            self.assertEqual(
+                file.read(),
+                '<div><p>See <a href="/index.html">Home</a> and '
+                '<a href="missing.html">missing.html</a></p></div>',
+            )
+
+    def test_rerender_title_dependents(self):
+        links = self.write("a.md", "See [](b.html)")
+        target = self.write("b.md", "# Old B")
+        build(self.content, self.public, workers=1)
+        graph = TitleGraph(self.content, self.public)
+        links_dest = os.path.join(self.public, "a.html")
+        target_dest = os.path.join(self.public, "b.html")
+
+        # A body edit keeps the title, so only the page itself re-renders.
+        self.write("b.md", "# Old B\n\nMore text")
+        self.assertEqual(graph.update([(target, target_dest)], []), [])
+
+        self.write("b.md", "# New B")
+        dependents = graph.update([(target, target_dest)], [])
+        self.assertEqual(dependents, [(links, links_dest)])
+        rerender([(target, target_dest)] + dependents, [], self.content, self.public)
+        with open(links_dest, encoding="utf-8") as file:
+            self.assertIn(">New B</a>", file.read())
+
+        os.remove(target)
+        dependents = graph.update([], [(target, target_dest)])
+        self.assertEqual(dependents, [(links, links_dest)])
+        rerender(dependents, [(target, target_dest)], self.content, self.public)
+        with open(links_dest, encoding="utf-8") as file:
+            self.assertIn(">b.html</a>", file.read())
+
+        self.write("b.md", "# Back")
+        dependents = graph.update([(target, target_dest)], [])
+        self.assertEqual(dependents, [(links, links_dest)])
+
+    def test_livereload(self):
+        livereload = LiveReload()
+        self.assertEqual(livereload.wait(0, timeout=0), 0)
+        threading.Timer(0.01, livereload.notify).start()
+        self.assertEqual(livereload.wait(0, timeout=5), 1)
+
+    def test_serve_injects_script(self):
+        os.makedirs(self.public)
+        with open(os.path.join(self.public, "index.html"), "w") as file:
+            file.write("<p>hi</p>")
+        with open(os.path.join(self.public, "styles.css"), "w") as file:
+            file.write("p {}")
+        server = serve(self.public, "127.0.0.1", 0, LiveReload())
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/"
+            with urllib.request.urlopen(url) as response:
+                self.assertEqual(
+                    response.read().decode("utf-8"), "<p>hi</p>" + LIVERELOAD_SCRIPT
+                )
+            with urllib.request.urlopen(url + "styles.css") as response:
+                self.assertEqual(response.read(), b"p {}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
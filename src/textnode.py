@@ -1,6 +1,6 @@
 from enum import Enum
 
-from htmlnode import LeafNode
+from htmlnode import LeafNode, escape_attribute, escape_text
 
 
 class TextType(Enum):
@@ -21,6 +21,8 @@ class TextNode:
     Represents a Markdown text node.
     """
 
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -37,22 +39,86 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node):
-    """
-    Converts text node into a HTML node.
-    """
-    if text_node.text_type not in TextType:
-        raise ValueError("wrong text type in conversion")
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(None, text_node.text)
-        case TextType.BOLD:
-            return LeafNode("b", text_node.text)
-        case TextType.ITALIC:
-            return LeafNode("i", text_node.text)
-        case TextType.CODE:
-            return LeafNode("code", text_node.text)
-        case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
-        case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+# Tag of the leaf node for each text type.
+TEXT_TYPE_TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+    TextType.LINK: "a",
+    TextType.IMAGE: "img",
+}
+# Open and close tags for each text type, as LeafNode.to_html writes them.
+# The link and image open tags take their escaped attributes through format.
+TEXT_TYPE_HTML = {
+    TextType.TEXT: ("", ""),
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+    TextType.LINK: ('<a href="{}">', "</a>"),
+    TextType.IMAGE: ('<img src="{}" alt="{}">', "</img>"),
+}
+
+
+def text_node_to_html_node(text_node, leaf_node=LeafNode):
+    """
+    Converts text node into a HTML node of the leaf_node class.
+    """
+    return text_part_to_html_node(
+        text_node.text_type, text_node.text, text_node.url, leaf_node
+    )
+
+
+def text_part_to_html_node(text_type, text, url=None, leaf_node=LeafNode):
+    """
+    Converts the text type, text and url of a text node into a HTML node of
+    the leaf_node class.
+    """
+    try:
+        tag = TEXT_TYPE_TAGS[text_type]
+    except (KeyError, TypeError):
+        raise ValueError("wrong text type in conversion") from None
+    if tag == "a":
+        return leaf_node(tag, text, {"href": url})
+    elif tag == "img":
+        return leaf_node(tag, "", {"src": url, "alt": text})
+    return leaf_node(tag, text)
+
+
+def text_nodes_to_html(text_nodes, escape=True):
+    """
+    Returns the HTML of a list of text nodes, the same as joining the to_html
+    of their converted leaf nodes, without creating the nodes. With escape
+    false, text is taken to need no escaping; attributes are always escaped.
+    """
+    return text_parts_to_html(
+        ((node.text_type, node.text, node.url) for node in text_nodes), escape
+    )
+
+
+def text_parts_to_html(parts, escape=True):
+    """
+    Returns the HTML of (text type, text, url) triples, as text_nodes_to_html
+    does for the text nodes holding them.
+    """
+    tags = TEXT_TYPE_HTML
+    link = TextType.LINK
+    image = TextType.IMAGE
+    html = []
+    append = html.append
+    for text_type, text, url in parts:
+        try:
+            open_tag, close_tag = tags[text_type]
+        except (KeyError, TypeError):
+            raise ValueError("wrong text type in conversion") from None
+        if text_type is link:
+            open_tag = open_tag.format(escape_attribute(str(url)))
+        elif text_type is image:
+            url = escape_attribute(str(url))
+            append(open_tag.format(url, escape_attribute(text)))
+            append(close_tag)
+            continue
+        append(open_tag)
+        append(escape_text(text) if escape else text)
+        append(close_tag)
+    return "".join(html)
@@ -0,0 +1,432 @@
+import ctypes
+import ctypes.util
+import functools
+import os
+import select
+import struct
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build import build, output_path, page_stem, remove_output, render_page
+from depgraph import page_links, reverse_links
+from manifest import load_manifest, manifest_path
+from template import extract_title
+
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# struct inotify_event: int wd, uint32 mask, uint32 cookie, uint32 len.
+INOTIFY_EVENT = struct.Struct("iIII")
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    "<script>new EventSource("
+    f'"{LIVERELOAD_PATH}"'
+    ").onmessage = () => location.reload();</script>"
+)
+
+
+class LiveReload:
+    """
+    Wakes every waiting browser connection when the site changes.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        """
+        Blocks until the version moves past version or timeout expires,
+        and returns the current version.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class PollingWatcher:
+    """
+    Detects changed Markdown files by rescanning the content directory.
+    """
+
+    def __init__(self, content_dir, public_dir):
+        self.content_dir = content_dir
+        self.public_dir = public_dir
+        self.snapshot = self.scan()
+
+    def scan(self):
+        """
+        Returns {source: (mtime_ns, size)} for every Markdown file.
+        """
+        snapshot = {}
+        directories = [self.content_dir]
+        while directories:
+            try:
+                entries = list(os.scandir(directories.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    elif entry.name.endswith(".md"):
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    continue
+        return snapshot
+
+    def poll(self, timeout):
+        """
+        Waits timeout seconds and returns the (changed, removed) pages as
+        (source, dest) pairs.
+        """
+        time.sleep(timeout)
+        snapshot = self.scan()
+        changed = [
+            source
+            for source, stamp in snapshot.items()
+            if self.snapshot.get(source) != stamp
+        ]
+        removed = [source for source in self.snapshot if source not in snapshot]
+        self.snapshot = snapshot
+        return self.pages(changed), self.pages(removed)
+
+    def pages(self, sources):
+        return [
+            (source, output_path(source, self.content_dir, self.public_dir))
+            for source in sorted(sources)
+        ]
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(PollingWatcher):
+    """
+    Detects changed Markdown files from Linux inotify events, so a change is
+    seen as soon as the file is written instead of on the next full rescan.
+    """
+
+    def __init__(self, content_dir, public_dir):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.add_watch_call = libc.inotify_add_watch
+        self.add_watch_call.argtypes = (
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        )
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        super().__init__(content_dir, public_dir)
+        self.add_watches(content_dir)
+
+    def add_watches(self, top):
+        """
+        Watches top and every directory below it.
+        """
+        for dirpath, _, _ in os.walk(top):
+            wd = self.add_watch_call(self.fd, os.fsencode(dirpath), INOTIFY_MASK)
+            if wd >= 0:
+                self.directories[wd] = dirpath
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return [], []
+        changed = set()
+        removed = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                directory = self.directories.get(wd)
+                if mask & IN_IGNORED:
+                    self.directories.pop(wd, None)
+                    continue
+                if mask & IN_Q_OVERFLOW or directory is None:
+                    rescan = True
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    # Whole directories moving in or out change many pages.
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.add_watches(path)
+                    rescan = True
+                elif mask & IN_CREATE:
+                    # New files are picked up by the close after writing.
+                    continue
+                elif path.endswith(".md"):
+                    if mask & (IN_DELETE | IN_MOVED_FROM):
+                        removed.add(path)
+                        changed.discard(path)
+                    else:
+                        changed.add(path)
+                        removed.discard(path)
+        if rescan:
+            return super().poll(0)
+        for source in removed:
+            self.snapshot.pop(source, None)
+        for source in changed:
+            try:
+                stat = os.stat(source)
+            except FileNotFoundError:
+                continue
+            self.snapshot[source] = (stat.st_mtime_ns, stat.st_size)
+        return self.pages(changed), self.pages(removed)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(content_dir, public_dir):
+    """
+    Returns an inotify watcher where the platform supports it, otherwise a
+    polling one.
+    """
+    try:
+        return InotifyWatcher(content_dir, public_dir)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(content_dir, public_dir)
+
+
+class TitleGraph:
+    """
+    Titles and title links of the pages of a site, seeded from its build
+    manifest and kept up to date as pages change, so watch mode re-renders
+    the pages showing a title that changed.
+    """
+
+    def __init__(self, content_dir, public_dir):
+        self.content_dir = content_dir
+        self.public_dir = public_dir
+        self.entries = {
+            key: {"title": entry["title"], "links": entry["links"]}
+            for key, entry in load_manifest(manifest_path(public_dir)).items()
+        }
+
+    def update(self, changed, removed):
+        """
+        Records the changed and removed (source, dest) pages and returns the
+        other pages to re-render: those showing the title of a changed page
+        whose title differs, or of an added or removed page.
+        """
+        content_prefix = len(os.path.join(self.content_dir, ""))
+        public_prefix = len(os.path.join(self.public_dir, ""))
+        retitled = set()
+        for source, dest in changed:
+            key = source[content_prefix:]
+            try:
+                with open(source, encoding="utf-8") as source_file:
+                    markdown = source_file.read()
+            except (OSError, ValueError):
+                # rerender reports the error.
+                continue
+            entry = {
+                "title": extract_title(markdown, page_stem(source)),
+                "links": page_links(markdown, dest[public_prefix:]),
+            }
+            old_entry = self.entries.get(key)
+            if old_entry is None or old_entry["title"] != entry["title"]:
+                retitled.add(key)
+            self.entries[key] = entry
+        for source, _ in removed:
+            key = source[content_prefix:]
+            self.entries.pop(key, None)
+            retitled.add(key)
+        dependents = reverse_links(self.entries)
+        skip = {source[content_prefix:] for source, _ in changed}
+        keys = {
+            key
+            for target in retitled
+            for key in dependents.get(target, ())
+            if key not in skip
+        }
+        return [
+            (source, output_path(source, self.content_dir, self.public_dir))
+            for source in sorted(os.path.join(self.content_dir, key) for key in keys)
+        ]
+
+
+def rerender(changed, removed, content_dir, public_dir, template=None):
+    """
+    Renders changed pages and removes the outputs of removed ones. Returns
+    the error messages of pages that failed to render.
+    """
+    errors = []
+    for source, dest in changed:
+        try:
+            titles = link_titles(source, dest, content_dir, public_dir)
+            render_page(source, dest, template=template, titles=titles)
+        except (OSError, ValueError) as error:
+            errors.append(str(error))
+    for _, dest in removed:
+        remove_output(dest, public_dir)
+    return errors
+
+
+def link_titles(source, dest, content_dir, public_dir):
+    """
+    Returns the {url: title} of the title links of a page, reading the
+    titles from the linked sources.
+    """
+    with open(source, encoding="utf-8") as source_file:
+        markdown = source_file.read()
+    titles = {}
+    output = dest[len(os.path.join(public_dir, "")) :]
+    for url, target in page_links(markdown, output):
+        path = os.path.join(content_dir, target)
+        try:
+            with open(path, encoding="utf-8") as target_file:
+                titles[url] = extract_title(target_file.read(), page_stem(path))
+        except OSError:
+            titles[url] = url
+    return titles
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the public directory, injecting the live reload script into HTML
+    pages and streaming reload events to them.
+    """
+
+    def __init__(self, *args, livereload, **kwargs):
+        self.livereload = livereload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self.send_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, "rb") as html_file:
+            body = html_file.read() + LIVERELOAD_SCRIPT.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.livereload.version
+        try:
+            while True:
+                new_version = self.livereload.wait(version, timeout=15)
+                if new_version == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(public_dir, host, port, livereload):
+    """
+    Starts serving public_dir in a background thread and returns the server.
+    """
+    handler = functools.partial(
+        LiveReloadHandler, directory=public_dir, livereload=livereload
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def template_stamp(template):
+    """
+    Returns the mtime of the template, or None without one.
+    """
+    if template is None:
+        return None
+    try:
+        return os.stat(template).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def watch(
+    content_dir,
+    public_dir,
+    host="127.0.0.1",
+    port=8000,
+    interval=0.05,
+    template=None,
+):
+    """
+    Builds the site, serves it with live reload and re-renders pages as their
+    sources change until interrupted. A change to the template re-renders
+    every page, and a change to a page title re-renders the pages showing it.
+    """
+    # The watcher starts first so edits made during the build are not lost.
+    watcher = make_watcher(content_dir, public_dir)
+    build(content_dir, public_dir, template=template)
+    graph = TitleGraph(content_dir, public_dir)
+    template_mtime = template_stamp(template)
+    livereload = LiveReload()
+    server = serve(public_dir, host, port, livereload)
+    print(f"Serving {public_dir} on http://{host}:{server.server_port}/")
+    try:
+        while True:
+            changed, removed = watcher.poll(interval)
+            mtime = template_stamp(template)
+            if mtime != template_mtime:
+                template_mtime = mtime
+                changed = watcher.pages(watcher.snapshot)
+            if not changed and not removed:
+                continue
+            start = time.perf_counter()
+            changed = changed + graph.update(changed, removed)
+            errors = rerender(changed, removed, content_dir, public_dir, template)
+            elapsed = time.perf_counter() - start
+            for error in errors:
+                print(f"error: {error}")
+            livereload.notify()
+            print(
+                f"Re-rendered {len(changed)} and removed {len(removed)} pages "
+                f"in {elapsed * 1000:.1f} ms"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        server.shutdown()
+        server.server_close()